@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Club, Event, ClubMembership, EventRegistration, UserProfile
+from .models import Club, Event, ClubMembership, EventRegistration, EventWaitlist, UserProfile
 
 @admin.register(Club)
 class ClubAdmin(admin.ModelAdmin):
@@ -8,8 +8,9 @@ class ClubAdmin(admin.ModelAdmin):
     search_fields = ('name', 'description')
     
     def get_member_count(self, obj):
-        return obj.members.count()
+        return obj.member_count
     get_member_count.short_description = 'Members'
+    get_member_count.admin_order_field = 'member_count'
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
@@ -18,8 +19,9 @@ class EventAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description', 'location')
     
     def get_registration_count(self, obj):
-        return obj.registered_users.count()
+        return obj.registration_count
     get_registration_count.short_description = 'Registrations'
+    get_registration_count.admin_order_field = 'registration_count'
 
 @admin.register(ClubMembership)
 class ClubMembershipAdmin(admin.ModelAdmin):
@@ -33,6 +35,12 @@ class EventRegistrationAdmin(admin.ModelAdmin):
     list_filter = ('registered_at', 'event')
     search_fields = ('user__username', 'user__email', 'event__title')
 
+@admin.register(EventWaitlist)
+class EventWaitlistAdmin(admin.ModelAdmin):
+    list_display = ('user', 'event', 'joined_at')
+    list_filter = ('joined_at', 'event')
+    search_fields = ('user__username', 'user__email', 'event__title')
+
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'department')
@@ -6,3 +6,4 @@ class ClubsConfig(AppConfig):
 
     def ready(self):
         import clubs.signals
+        import clubs.db
@@ -0,0 +1,150 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.http import Http404
+from django.shortcuts import redirect, render
+from django.utils import timezone
+
+from . import calendar_data, exports, search
+from .models import Club, ClubMembership, Event, EventWaitlist
+from .objects import aget_cached_or_404
+from .page_cache import public_page_cache
+from .pagination import keyset_page
+from .routing import replica_reads
+from .views import LIST_PAGE_SIZE, SEARCH_PAGE_SIZE, clubs_for, events_for, export_response
+
+# Async twins of the read-only views in clubs.views, routed instead of them
+# when the app runs under ASGI (settings.ASYNC_VIEWS, set by asgi.py).
+# Independent queries are issued together with asyncio.gather. Templates
+# render off the event loop, since they may still follow relations lazily.
+# Exports stream from async generators: ASGI would collect a sync iterator
+# into one list before sending anything.
+arender = sync_to_async(render)
+
+
+async def _list(queryset):
+    return [obj async for obj in queryset]
+
+
+async def _nothing():
+    return None
+
+
+@replica_reads
+@public_page_cache('clubs', 'events')
+async def home(request):
+    query = request.GET.get('q')
+    if query:
+        # Top-ranked hits only; the full result set lives on the search page.
+        # Slicing search results runs the query, so all of it goes off the loop.
+        clubs = sync_to_async(lambda: list(search.search_clubs(query)[:SEARCH_PAGE_SIZE]))()
+        upcoming_events = sync_to_async(lambda: list(search.search_events(query)[:SEARCH_PAGE_SIZE]))()
+    else:
+        clubs = _list(Club.objects.order_by('-member_count')[:3])
+        upcoming_events = _list(Event.objects.filter(date__gte=timezone.now()).order_by('date')[:5])
+    clubs, upcoming_events = await asyncio.gather(clubs, upcoming_events)
+    return await arender(request, 'index.html', {
+        'clubs': clubs,
+        'upcoming_events': upcoming_events,
+    })
+
+
+@replica_reads
+async def club_list(request):
+    user = await request.auser()
+    query = request.GET.get('q')
+    if query:
+        results = search.search_clubs(query, queryset=clubs_for(user))
+        clubs = await sync_to_async(Paginator(results, SEARCH_PAGE_SIZE).get_page)(request.GET.get('page'))
+    else:
+        clubs = await sync_to_async(keyset_page)(
+            clubs_for(user), ('name', 'id'), LIST_PAGE_SIZE,
+            after=request.GET.get('after'), before=request.GET.get('before'),
+        )
+    return await arender(request, 'clubs/club_list.html', {'clubs': clubs, 'query': query})
+
+
+@public_page_cache('club:{club_id}')
+async def club_detail(request, club_id):
+    user = await request.auser()
+    club, membership = await asyncio.gather(
+        aget_cached_or_404(Club, club_id),
+        ClubMembership.objects.filter(user=user, club_id=club_id).afirst() if user.is_authenticated
+        else _nothing(),
+    )
+    return await arender(request, 'clubs/club_detail.html', {'club': club, 'membership': membership})
+
+
+@replica_reads
+async def event_list(request):
+    user = await request.auser()
+    events = await sync_to_async(keyset_page)(
+        events_for(user).filter(date__gte=timezone.now()), ('date', 'id'), LIST_PAGE_SIZE,
+        after=request.GET.get('after'), before=request.GET.get('before'),
+    )
+    return await arender(request, 'clubs/event_list.html', {'events': events, 'now': timezone.now()})
+
+
+@public_page_cache('event:{event_id}')
+async def event_detail(request, event_id):
+    user = await request.auser()
+    event, waitlist_entry = await asyncio.gather(
+        aget_cached_or_404(Event, event_id, related=('club',)),
+        EventWaitlist.objects.filter(user=user, event_id=event_id).afirst() if user.is_authenticated
+        else _nothing(),
+    )
+    position = await sync_to_async(waitlist_entry.position)() if waitlist_entry else None
+    return await arender(request, 'clubs/event_detail.html', {
+        'event': event,
+        'now': timezone.now(),
+        'waitlist_position': position,
+    })
+
+
+@replica_reads
+@login_required
+async def calendar_view(request):
+    current_date = calendar_data.requested_month(request.GET.get('month'))
+    _, current, following = calendar_data.month_starts(current_date)
+    current_month, next_month = await asyncio.gather(
+        sync_to_async(calendar_data.get_month)(current.year, current.month),
+        sync_to_async(calendar_data.get_month)(following.year, following.month),
+    )
+    await sync_to_async(calendar_data.mark_full)(current_month, next_month)
+    context = calendar_data.page_context(current_date, current_month, next_month)
+    return await arender(request, 'clubs/calendar.html', context)
+
+
+async def _can_manage(request, club):
+    user = await request.auser()
+    return await sync_to_async(lambda: user.userprofile.can_manage_club(club))()
+
+
+@login_required
+async def export_event_registrations(request, event_id, fmt):
+    event = await aget_cached_or_404(Event, event_id, related=('club',))
+    if fmt not in exports.FORMATS:
+        raise Http404
+    if not await _can_manage(request, event.club):
+        messages.error(request, "You don't have permission to export registrations.")
+        return redirect('event_detail', event_id=event_id)
+    return export_response(
+        exports.aevent_registrations(event, fmt), exports.filename('event-registrations', event.id, fmt), fmt
+    )
+
+
+@login_required
+async def export_club_members(request, club_id, fmt):
+    club = await aget_cached_or_404(Club, club_id)
+    if fmt not in exports.FORMATS:
+        raise Http404
+    if not await _can_manage(request, club):
+        messages.error(request, "You don't have permission to export members.")
+        return redirect('club_detail', club_id=club_id)
+    status = request.GET.get('status') or None
+    return export_response(
+        exports.aclub_members(club, fmt, status), exports.filename('club-members', club.id, fmt), fmt
+    )
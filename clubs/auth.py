@@ -1,17 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
 from .models import UserProfile
 
+# Short-lived, process-local cache of authenticated principals (user row +
+# profile row) keyed by user id. Only raw field values are stored; fresh
+# model instances are rebuilt on every hit so per-request state never leaks
+# between requests. Django still checks the session auth hash against the
+# returned user, and clubs.signals evicts an entry whenever the user or
+# profile is saved, so the TTL only bounds staleness across processes.
+PRINCIPAL_TTL = getattr(settings, 'AUTH_PRINCIPAL_CACHE_TTL', 30)
+# Most entries kept per process; past it the oldest are dropped first
+PRINCIPAL_CACHE_SIZE = getattr(settings, 'AUTH_PRINCIPAL_CACHE_SIZE', 5000)
+
+_principals = OrderedDict()
+_lock = threading.Lock()
+
+
+def _field_names(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _snapshot(user):
+    profile = getattr(user, 'userprofile', None)
+    user_fields = _field_names(type(user))
+    profile_fields = _field_names(UserProfile)
+    return (
+        user._state.db,
+        [getattr(user, name) for name in user_fields],
+        [getattr(profile, name) for name in profile_fields] if profile else None,
+    )
+
+
+def _restore(snapshot):
+    db, user_values, profile_values = snapshot
+    UserModel = get_user_model()
+    user = UserModel.from_db(db, _field_names(UserModel), user_values)
+    if profile_values is not None:
+        profile = UserProfile.from_db(db, _field_names(UserProfile), profile_values)
+        # Wire up both sides so user.userprofile and profile.user never query
+        user._state.fields_cache['userprofile'] = profile
+        profile._state.fields_cache['user'] = user
+    return user
+
+
+def cache_principal(user):
+    if PRINCIPAL_TTL:
+        now = time.monotonic()
+        with _lock:
+            _principals[user.pk] = (now + PRINCIPAL_TTL, _snapshot(user))
+            _principals.move_to_end(user.pk)
+            # Every entry gets the same TTL, so the oldest expire first
+            while _principals:
+                oldest, (expires, _) = next(iter(_principals.items()))
+                if expires >= now and len(_principals) <= PRINCIPAL_CACHE_SIZE:
+                    break
+                del _principals[oldest]
+
+
+def cached_principal(user_id):
+    with _lock:
+        entry = _principals.get(user_id)
+        if entry is None:
+            return None
+        expires, snapshot = entry
+        if expires < time.monotonic():
+            del _principals[user_id]
+            return None
+    return _restore(snapshot)
+
+
+def evict_principal(user_id):
+    with _lock:
+        _principals.pop(user_id, None)
+
+
 class RoleBasedAuthenticationBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
         UserModel = get_user_model()
         role = request.POST.get('role', 'student')
 
         try:
-            user = UserModel.objects.get(username=username)
+            user = UserModel.objects.select_related('userprofile').get(username=username)
             if user.check_password(password):
                 try:
-                    profile = UserProfile.objects.get(user=user)
+                    profile = user.userprofile
                     if profile.role == role or (role == 'admin' and user.is_superuser):
                         return user
                 except UserProfile.DoesNotExist:
@@ -22,7 +99,12 @@ class RoleBasedAuthenticationBackend(ModelBackend):
 
     def get_user(self, user_id):
         UserModel = get_user_model()
+        user = cached_principal(user_id)
+        if user is not None:
+            return user
         try:
-            return UserModel.objects.get(pk=user_id)
+            user = UserModel.objects.select_related('userprofile').get(pk=user_id)
         except UserModel.DoesNotExist:
             return None
+        cache_principal(user)
+        return user
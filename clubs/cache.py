@@ -0,0 +1,39 @@
+from django.core.cache import cache
+
+# Generation counters: cached values embed the current version of whatever
+# they were built from in their key, so invalidating is a single increment
+# and stale entries simply age out.
+VERSION_TIMEOUT = None
+
+
+def get_version(name):
+    key = f'version:{name}'
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, VERSION_TIMEOUT)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_version(name):
+    key = f'version:{name}'
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, 2, VERSION_TIMEOUT)
+        return cache.get(key, 2)
+
+
+def versioned_key(prefix, *names):
+    versions = '.'.join(str(get_version(name)) for name in names)
+    return f'{prefix}:v{versions}'
+
+
+def get_versions(names):
+    # get_version() for many names in one round trip
+    keys = {f'version:{name}': name for name in names}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        cache.add(key, 1, VERSION_TIMEOUT)
+        found[key] = cache.get(key, 1)
+    return {name: found[key] for key, name in keys.items()}
@@ -0,0 +1,121 @@
+import calendar
+import datetime
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .cache import bump_version, versioned_key
+from .models import Event
+from .routing import on_primary
+
+MONTH_TIMEOUT = 60 * 60
+
+# Only what calendar.html renders; capacity state is looked up live
+MONTH_FIELDS = ('id', 'title', 'date', 'location', 'capacity')
+
+
+def month_name(year, month):
+    return f'calendar:{year:04d}-{month:02d}'
+
+
+def month_bounds(year, month):
+    start = timezone.make_aware(datetime.datetime(year, month, 1))
+    if month == 12:
+        end = timezone.make_aware(datetime.datetime(year + 1, 1, 1))
+    else:
+        end = timezone.make_aware(datetime.datetime(year, month + 1, 1))
+    return start, end
+
+
+# Cached for an hour, so never built from a lagging replica
+@on_primary
+def _build_month(year, month):
+    start, end = month_bounds(year, month)
+    # Half-open range on the indexed column instead of date__year/__month
+    events = list(
+        Event.objects.filter(date__gte=start, date__lt=end).order_by('date', 'id').values(*MONTH_FIELDS)
+    )
+    events_by_day = {}
+    for event in events:
+        events_by_day.setdefault(timezone.localtime(event['date']).day, []).append(event)
+    return {'events': events, 'events_by_day': events_by_day}
+
+
+def get_month(year, month):
+    name = month_name(year, month)
+    key = versioned_key(name, name)
+    payload = cache.get(key)
+    if payload is None:
+        payload = _build_month(year, month)
+        cache.set(key, payload, MONTH_TIMEOUT)
+    return payload
+
+
+def mark_full(*payloads):
+    # Registration counts change far more often than events do, so fullness
+    # is filled in per request with one primary-key lookup per page.
+    limited = [event for payload in payloads for event in payload['events'] if event['capacity']]
+    counts = dict(Event.objects.filter(id__in=[event['id'] for event in limited]).values_list('id', 'registration_count'))
+    for payload in payloads:
+        for event in payload['events']:
+            event['is_full'] = bool(event['capacity']) and counts.get(event['id'], 0) >= event['capacity']
+
+
+def requested_month(param):
+    # ?month=YYYY-MM, else the current month
+    if param:
+        try:
+            parsed = datetime.datetime.strptime(param, '%Y-%m')
+            return timezone.make_aware(datetime.datetime(parsed.year, parsed.month, 1))
+        except ValueError:
+            pass
+    return timezone.now()
+
+
+def month_starts(date):
+    # Starts of the previous, current and next month around date
+    previous = month_bounds(date.year - 1, 12) if date.month == 1 else month_bounds(date.year, date.month - 1)
+    current, following = month_bounds(date.year, date.month)
+    return previous[0], current, following
+
+
+def page_context(date, current_month, next_month):
+    previous, current, following = month_starts(date)
+    return {
+        'current_month_events': current_month['events'],
+        'next_month_events': next_month['events'],
+        'prev_month': previous,
+        'current_month': current,
+        'next_month': following,
+        'calendar_weeks': calendar.monthcalendar(date.year, date.month),
+        'events_by_day': current_month['events_by_day'],
+        'weekdays': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+    }
+
+
+def invalidate_month(date):
+    if date is not None:
+        local = timezone.localtime(date)
+        bump_version(month_name(local.year, local.month))
+
+
+def month_json(year, month):
+    payload = get_month(year, month)
+    mark_full(payload)
+    return {
+        'year': year,
+        'month': month,
+        'days': {
+            str(day): [
+                {
+                    'id': event['id'],
+                    'title': event['title'],
+                    'date': event['date'].isoformat(),
+                    'location': event['location'],
+                    'is_full': event['is_full'],
+                }
+                for event in events
+            ]
+            for day, events in payload['events_by_day'].items()
+        },
+    }
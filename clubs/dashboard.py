@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from .cache import bump_version, get_version
+from .models import Club, Event
+
+# Dashboard panels are cached as template fragments per user, keyed by that
+# user's membership version. Joining, leaving, registering or cancelling
+# bumps the version; the timeout covers everything else that can drift
+# (events passing, edited titles, rebuilt recommendations).
+FRAGMENT_TIMEOUT = getattr(settings, 'DASHBOARD_FRAGMENT_TIMEOUT', 300)
+
+
+def version_name(user_id):
+    return f'memberships:{user_id}'
+
+
+def membership_version(user_id):
+    return get_version(version_name(user_id))
+
+
+def invalidate(user_id):
+    bump_version(version_name(user_id))
+
+
+def _lazy_list(build):
+    # Only evaluated if the template renders the panel, i.e. on a cache miss
+    return SimpleLazyObject(lambda: list(build()))
+
+
+def panels(user):
+    now = timezone.now()
+    return {
+        'registered_events': _lazy_list(lambda: Event.objects.filter(
+            registered_users=user,
+            date__gte=now
+        ).order_by('date')),
+        'user_clubs': _lazy_list(lambda: Club.objects.filter(members=user)),
+        'recommended_clubs': _lazy_list(lambda: Club.get_recommended_clubs(user)),
+        'recommended_events': _lazy_list(lambda: Event.get_recommended_events(user)),
+    }
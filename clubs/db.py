@@ -0,0 +1,75 @@
+import functools
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+# Applied to every new SQLite connection. WAL lets readers carry on while a
+# write commits; NORMAL sync is safe under WAL (a power cut can only lose the
+# last commits, never corrupt). How long a writer queues for the lock is
+# the connection's 'timeout' option in settings.DATABASES, not a pragma here,
+# so there is one value to tune (see retry_on_locked for the total).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'foreign_keys': 'ON',
+    'cache_size': -64000,        # KiB, i.e. 64 MB of page cache
+    'mmap_size': 268435456,      # 256 MB
+    'temp_store': 'MEMORY',
+}
+SQLITE_PRAGMAS.update(getattr(settings, 'SQLITE_PRAGMAS', {}))
+
+# Worst case for one unit of work under retry_on_locked: every attempt waits
+# out the driver timeout, plus the backoff between attempts (at most
+# LOCK_BACKOFF * 1.5 * (2**(LOCK_RETRIES - 1) - 1), about 1.1 s). With the
+# defaults (timeout 5 s, 5 attempts) that is roughly 26 s.
+LOCK_RETRIES = getattr(settings, 'SQLITE_LOCK_RETRIES', 5)
+LOCK_BACKOFF = 0.05
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+        return
+    with connection.cursor() as cursor:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked_error(exc):
+    message = str(exc).lower()
+    return 'database is locked' in message or 'database table is locked' in message
+
+
+def retry_on_locked(func=None, attempts=None):
+    # The driver timeout covers plain waits, but a transaction that read
+    # first and then tries to write fails immediately if another writer got
+    # in between.
+    # Each attempt runs in its own transaction, so a failed one leaves nothing
+    # behind (counter updates from signals included) and the whole unit of
+    # work is re-run after a jittered exponential backoff.
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            # Inside someone else's transaction a retry can't start afresh
+            if connection.in_atomic_block:
+                return view(*args, **kwargs)
+            tries = attempts or LOCK_RETRIES
+            for attempt in range(tries):
+                try:
+                    with transaction.atomic():
+                        return view(*args, **kwargs)
+                except OperationalError as exc:
+                    if not is_locked_error(exc) or attempt == tries - 1:
+                        raise
+                    delay = LOCK_BACKOFF * (2 ** attempt) * (0.5 + random.random())
+                    logger.info('%s hit a locked database, retrying in %.0f ms', view.__name__, delay * 1000)
+                    time.sleep(delay)
+        return wrapper
+    return decorator(func) if func else decorator
@@ -0,0 +1,114 @@
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from .models import ClubMembership, EventRegistration
+
+# Roster exports are generated row by row from a server-side cursor over
+# values_list() tuples, so memory stays flat however large the roster is.
+# The a* variants are async generators for the ASGI views.
+CHUNK_SIZE = 2000
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+REGISTRATION_COLUMNS = [
+    ('username', 'user__username'),
+    ('first_name', 'user__first_name'),
+    ('last_name', 'user__last_name'),
+    ('email', 'user__email'),
+    ('student_id', 'user__userprofile__student_id'),
+    ('department', 'user__userprofile__department'),
+    ('registered_at', 'registered_at'),
+]
+
+MEMBERSHIP_COLUMNS = [
+    ('username', 'user__username'),
+    ('first_name', 'user__first_name'),
+    ('last_name', 'user__last_name'),
+    ('email', 'user__email'),
+    ('student_id', 'user__userprofile__student_id'),
+    ('department', 'user__userprofile__department'),
+    ('role', 'role'),
+    ('status', 'status'),
+    ('joined_date', 'joined_date'),
+    ('approved_date', 'approved_date'),
+]
+
+
+class _Echo:
+    # csv.writer wants a file; hand each formatted line straight back instead
+    def write(self, value):
+        return value
+
+
+def _rows(queryset, columns):
+    fields = [field for _, field in columns]
+    return queryset.order_by('id').values_list(*fields)
+
+
+def _formatter(fmt, columns):
+    # (header line or None, function turning one row into its line)
+    names = [name for name, _ in columns]
+    if fmt == 'csv':
+        writer = csv.writer(_Echo())
+        return writer.writerow(names), writer.writerow
+    return None, lambda row: json.dumps(dict(zip(names, row)), default=str) + '\n'
+
+
+def _lines(fmt, columns, queryset):
+    header, line = _formatter(fmt, columns)
+    if header is not None:
+        yield header
+    for row in _rows(queryset, columns).iterator(chunk_size=CHUNK_SIZE):
+        yield line(row)
+
+
+async def _alines(fmt, columns, queryset):
+    # Under ASGI a sync iterator would be collected into a list before the
+    # first byte goes out. Here the same server-side cursor is read one chunk
+    # at a time off the loop (always in the same sync thread, which owns the
+    # connection). QuerySet.aiterator() can't be used: for values_list() it
+    # opens the cursor on the loop itself.
+    header, line = _formatter(fmt, columns)
+    if header is not None:
+        yield header
+    rows = _rows(queryset, columns).iterator(chunk_size=CHUNK_SIZE)
+    next_chunk = sync_to_async(lambda: list(islice(rows, CHUNK_SIZE)))
+    while chunk := await next_chunk():
+        for row in chunk:
+            yield line(row)
+
+
+def _registrations(event):
+    return EventRegistration.objects.filter(event=event)
+
+
+def _members(club, status=None):
+    queryset = ClubMembership.objects.filter(club=club)
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset
+
+
+def event_registrations(event, fmt):
+    return _lines(fmt, REGISTRATION_COLUMNS, _registrations(event))
+
+
+def club_members(club, fmt, status=None):
+    return _lines(fmt, MEMBERSHIP_COLUMNS, _members(club, status))
+
+
+def aevent_registrations(event, fmt):
+    return _alines(fmt, REGISTRATION_COLUMNS, _registrations(event))
+
+
+def aclub_members(club, fmt, status=None):
+    return _alines(fmt, MEMBERSHIP_COLUMNS, _members(club, status))
+
+
+def filename(prefix, obj_id, fmt):
+    return f'{prefix}-{obj_id}.{fmt}'
@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection, transaction
+
+from . import objects
+
+logger = logging.getLogger(__name__)
+
+# Responsive variants written next to each upload as
+# <upload dir>/variants/<stem>-<width>w.<format>
+VARIANT_WIDTHS = getattr(settings, 'IMAGE_VARIANT_WIDTHS', (320, 640, 1280))
+VARIANT_FORMATS = getattr(settings, 'IMAGE_VARIANT_FORMATS', ('avif', 'webp'))
+THUMBNAIL_SIZE = getattr(settings, 'IMAGE_THUMBNAIL_SIZE', (400, 300))
+WORKERS = getattr(settings, 'IMAGE_WORKERS', 2)
+# 'async' hands work to a process pool; 'sync' renders inline (scripts, tests)
+MODE = getattr(settings, 'IMAGE_PROCESSING', 'async')
+# Which variants exist is remembered per image, so rendering a page never
+# probes storage once the pipeline has reported back
+VARIANTS_TIMEOUT = 60 * 60 * 24
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_name(name, width, fmt):
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'variants', f'{stem}-{width}w.{fmt}')
+
+
+def _variants_key(name):
+    return f"image-variants:{hashlib.md5(name.encode()).hexdigest()}"
+
+
+def remember_variants(name, written):
+    # Called with render()'s list of written files when the pipeline finishes
+    found = {fmt: [] for fmt in VARIANT_FORMATS}
+    for fmt in VARIANT_FORMATS:
+        for width in VARIANT_WIDTHS:
+            if variant_name(name, width, fmt) in written:
+                found[fmt].append(width)
+    cache.set(_variants_key(name), found, VARIANTS_TIMEOUT)
+
+
+def available_variants(name):
+    # {format: [widths]} for the variants of an upload. Storage is only
+    # probed for images the pipeline hasn't reported on in this cache,
+    # e.g. ones processed before a restart.
+    key = _variants_key(name)
+    found = cache.get(key)
+    if found is None:
+        found = {
+            fmt: [width for width in VARIANT_WIDTHS if default_storage.exists(variant_name(name, width, fmt))]
+            for fmt in VARIANT_FORMATS
+        }
+        cache.set(key, found, VARIANTS_TIMEOUT)
+    return found
+
+
+def thumbnail_name(name, thumbnail_dir):
+    stem, ext = os.path.splitext(os.path.basename(name))
+    return os.path.join(thumbnail_dir, f'{stem}-thumb{ext}')
+
+
+def _supported_formats():
+    from PIL import features
+    return [fmt for fmt in VARIANT_FORMATS if features.check(fmt)]
+
+
+def render(media_root, name, thumbnail_dir=None):
+    # Runs in a worker process: pure Pillow and filesystem work, no ORM.
+    from PIL import Image, ImageOps
+
+    source = os.path.join(media_root, name)
+    written = []
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+        for fmt in _supported_formats():
+            for width in VARIANT_WIDTHS:
+                if width > image.width and width != VARIANT_WIDTHS[0]:
+                    continue
+                target = variant_name(name, width, fmt)
+                os.makedirs(os.path.dirname(os.path.join(media_root, target)), exist_ok=True)
+                resized = image.copy()
+                resized.thumbnail((width, width * 4))
+                resized.save(os.path.join(media_root, target), fmt.upper(), quality=80)
+                written.append(target)
+
+        thumbnail = None
+        if thumbnail_dir:
+            thumbnail = thumbnail_name(name, thumbnail_dir)
+            os.makedirs(os.path.dirname(os.path.join(media_root, thumbnail)), exist_ok=True)
+            fitted = ImageOps.fit(image, THUMBNAIL_SIZE)
+            if fitted.mode == 'RGBA' and original.format == 'JPEG':
+                fitted = fitted.convert('RGB')
+            fitted.save(os.path.join(media_root, thumbnail), original.format or 'PNG')
+    return thumbnail, written
+
+
+def _executor_instance():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=WORKERS)
+        return _executor
+
+
+def _store_thumbnail(model, pk, field, name, thumbnail_field, thumbnail):
+    # Only fill the thumbnail if the image hasn't been replaced meanwhile.
+    # update() keeps this off the save signals, which don't care about it.
+    if thumbnail_field and thumbnail:
+        if model.objects.filter(pk=pk, **{field: name}).update(**{thumbnail_field: thumbnail}):
+            objects.invalidate(model, pk)
+
+
+def _finished(model, pk, field, name, thumbnail_field):
+    def callback(future):
+        close_old_connections()
+        try:
+            thumbnail, written = future.result()
+            remember_variants(name, written)
+            _store_thumbnail(model, pk, field, name, thumbnail_field, thumbnail)
+        except Exception:
+            logger.exception('Image processing failed for %s %s (%s)', model.__name__, pk, name)
+        finally:
+            connection.close()
+    return callback
+
+
+def process(instance, field, thumbnail_field=None):
+    name = getattr(instance, field).name
+    if not name:
+        return
+    thumbnail_dir = instance._meta.get_field(thumbnail_field).upload_to if thumbnail_field else None
+    if MODE == 'sync':
+        thumbnail, written = render(settings.MEDIA_ROOT, name, thumbnail_dir)
+        remember_variants(name, written)
+        _store_thumbnail(type(instance), instance.pk, field, name, thumbnail_field, thumbnail)
+        return
+    future = _executor_instance().submit(render, settings.MEDIA_ROOT, name, thumbnail_dir)
+    future.add_done_callback(_finished(type(instance), instance.pk, field, name, thumbnail_field))
+
+
+def process_upload(form, field, thumbnail_field=None):
+    # Call after form.save(): queue work once the row is committed, and only
+    # when a new file actually came in with this request.
+    if field in form.changed_data:
+        instance = form.instance
+        # Leave a thumbnail the user uploaded alongside the image alone
+        if thumbnail_field in form.changed_data:
+            thumbnail_field = None
+        transaction.on_commit(lambda: process(instance, field, thumbnail_field))
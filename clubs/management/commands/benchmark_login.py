@@ -0,0 +1,65 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from clubs.models import UserProfile
+from clubs.signals import suppress_profile_sync
+
+PASSWORD = 'bench-login-pw'
+
+
+def legacy_save_user_profile(sender, instance, **kwargs):
+    # The pre-dirty-tracking handler: rewrite the profile on every User save
+    try:
+        instance.userprofile.save()
+    except UserProfile.DoesNotExist:
+        UserProfile.objects.create(user=instance)
+
+
+class Command(BaseCommand):
+    help = 'Measures login throughput and queries per login, with and without legacy profile syncing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=300)
+
+    @override_settings(
+        PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+        ALLOWED_HOSTS=['*'],
+    )
+    def handle(self, *args, **options):
+        stamp = int(time.time() * 1000)
+        with suppress_profile_sync():
+            users = [
+                User.objects.create_user(username=f'bench-login-{stamp}-{i}', password=PASSWORD)
+                for i in range(options['logins'])
+            ]
+        UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+        try:
+            for label, legacy in (('before (legacy sync)', True), ('after (dirty tracking)', False)):
+                if legacy:
+                    post_save.connect(legacy_save_user_profile, sender=User, dispatch_uid='bench-legacy-profile')
+                try:
+                    self.report(label, users)
+                finally:
+                    post_save.disconnect(sender=User, dispatch_uid='bench-legacy-profile')
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def report(self, label, users):
+        client = Client()
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for user in users:
+                client.post('/login/', {'username': user.username, 'password': PASSWORD, 'role': 'student'})
+                client.logout()
+        elapsed = time.perf_counter() - started
+        writes = sum(1 for query in queries.captured_queries if 'clubs_userprofile' in query['sql'] and query['sql'].startswith('UPDATE'))
+        self.stdout.write(
+            f'{label}: {len(users) / elapsed:.0f} logins/s, '
+            f'{len(queries.captured_queries) / len(users):.1f} queries/login, '
+            f'{writes} profile UPDATEs'
+        )
@@ -0,0 +1,160 @@
+import random
+import threading
+import time
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.utils import timezone
+from clubs import db
+from clubs.models import Club, ClubMembership, Event
+from clubs.views import clubs_for, events_for
+
+# What a stock Django + SQLite setup runs with: rollback journal, full sync,
+# a fresh connection per request and no retry when a write hits a lock.
+STOCK = {
+    'pragmas': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+    'persistent': False,
+    'retry': False,
+}
+TUNED = {
+    'pragmas': None,  # clubs.db.SQLITE_PRAGMAS as configured
+    'persistent': True,
+    'retry': True,
+}
+
+
+class Command(BaseCommand):
+    help = ('Runs a mixed read/write workload from concurrent threads under the stock SQLite '
+            'setup and under the clubs.db profile (WAL, pragmas, persistent connections, '
+            'lock retries) and compares throughput')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=10.0, help='Duration of each run')
+        parser.add_argument('--only', choices=['stock', 'tuned'], help='Run just one profile')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+            raise CommandError('Needs a file-backed SQLite database')
+        now = timezone.now()
+        events = list(Event.objects.filter(date__gte=now, capacity=0).values_list('id', flat=True)[:50])
+        clubs = list(Club.objects.values_list('id', flat=True)[:50])
+        readers = list(User.objects.filter(clubmembership__isnull=False).distinct()[:options['readers']])
+        if not (events and clubs and readers):
+            raise CommandError('Needs some data: run generate_dataset (or create_sample_data) first')
+
+        stamp = int(time.time() * 1000)
+        writers = User.objects.bulk_create([
+            User(username=f'bench-{stamp}-{i}') for i in range(options['writers'])
+        ])
+        profiles = [('stock', STOCK), ('tuned', TUNED)]
+        if options['only']:
+            profiles = [p for p in profiles if p[0] == options['only']]
+        saved = dict(db.SQLITE_PRAGMAS)
+        results = {}
+        try:
+            for name, profile in profiles:
+                results[name] = self.run(profile, saved, readers, writers, events, clubs, options['seconds'])
+                self.report(name, results[name])
+        finally:
+            db.SQLITE_PRAGMAS.clear()
+            db.SQLITE_PRAGMAS.update(saved)
+            connection.close()
+            User.objects.filter(pk__in=[user.pk for user in writers]).delete()
+
+        if 'stock' in results and 'tuned' in results:
+            for key in ('reads', 'writes'):
+                before, after = results['stock'][key], results['tuned'][key]
+                gain = f'{after / before:.1f}x' if before else 'n/a'
+                self.stdout.write(f'{key}/s: {before:.0f} -> {after:.0f} ({gain})')
+
+    def run(self, profile, saved, readers, writers, events, clubs, seconds):
+        db.SQLITE_PRAGMAS.clear()
+        db.SQLITE_PRAGMAS.update(profile['pragmas'] or saved)
+        # journal_mode sticks to the file, so switch it with nobody else connected
+        connection.close()
+        connection.ensure_connection()
+        connection.close()
+
+        counts = Counter()
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def tally(key):
+            with lock:
+                counts[key] += 1
+
+        def finish_op():
+            # Without persistent connections every request opens its own
+            if not profile['persistent']:
+                connection.close()
+
+        def read(user, rng):
+            list(events_for(user).filter(date__gte=timezone.now()).order_by('date', 'id')[:13])
+            club_id = rng.choice(clubs)
+            list(clubs_for(user).filter(pk=club_id))
+            list(ClubMembership.objects.filter(club_id=club_id, status='approved').select_related('user')[:20])
+
+        def write(user, event):
+            # 'duplicate' is left over from an earlier cancel that hit a lock
+            result = event.register(user, enforce_deadline=False)
+            if result not in ('registered', 'duplicate'):
+                raise CommandError(f'Could not register on event {event.pk}: {result}')
+            event.cancel_registration(user)
+
+        if profile['retry']:
+            write = db.retry_on_locked(write)
+
+        def reader(user):
+            rng = random.Random(user.pk)
+            try:
+                while not stop.is_set():
+                    try:
+                        read(user, rng)
+                        tally('reads')
+                    except OperationalError:
+                        tally('read_errors')
+                    finish_op()
+            finally:
+                connection.close()
+
+        def writer(user):
+            rng = random.Random(user.pk)
+            try:
+                while not stop.is_set():
+                    event = Event(pk=rng.choice(events))
+                    try:
+                        write(user, event)
+                        tally('writes')
+                    except OperationalError:
+                        tally('write_errors')
+                    finish_op()
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reader, args=(user,)) for user in readers]
+        threads += [threading.Thread(target=writer, args=(user,)) for user in writers]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        return {
+            'reads': counts['reads'] / elapsed,
+            'writes': counts['writes'] / elapsed,
+            'read_errors': counts['read_errors'],
+            'write_errors': counts['write_errors'],
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<6} {result['reads']:>8.0f} reads/s  {result['writes']:>7.0f} writes/s  "
+            f"{result['read_errors']:>4} failed reads  {result['write_errors']:>4} failed writes"
+        )
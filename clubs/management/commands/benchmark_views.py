@@ -0,0 +1,221 @@
+import json
+import os
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from clubs.auth import evict_principal
+from clubs.models import Club, ClubMembership, Event, EventRegistration
+
+# Most queries each view may run on a cold cache, session lookup included.
+# These are fixed numbers on purpose: a view that starts issuing a query per
+# row blows straight through them however small the local dataset is.
+QUERY_BUDGETS = {
+    'home': 2,
+    'club_list': 5,
+    'club_detail': 8,
+    'event_list': 5,
+    'event_detail': 8,
+    'search': 10,
+    'calendar': 7,
+    'calendar_month_json': 6,
+    'dashboard': 10,
+    'profile': 9,
+    'public_profile': 5,
+    'member_list': 6,
+    'club_manage': 10,
+    'join_club': 8,
+    'register_event': 7,
+}
+
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'views.json')
+
+
+class Command(BaseCommand):
+    help = ('Drives every main view through the test client against the current database and '
+            'checks query counts, latency and allocations against budgets and a JSON baseline. '
+            'Run generate_dataset first for meaningful numbers.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per view (median is reported)')
+        parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+        parser.add_argument('--save-baseline', action='store_true', help='Write these results as the new baseline')
+        parser.add_argument('--threshold', type=float, default=1.25,
+                            help='Fail when a view is this many times slower than its baseline')
+        parser.add_argument('--min-regression-ms', type=float, default=5.0,
+                            help='Ignore slowdowns smaller than this, whatever the ratio')
+        parser.add_argument('--warm', action='store_true', help="Don't clear caches between runs")
+        parser.add_argument('--only', nargs='+', help='Only run these views')
+        parser.add_argument('--output', help='Also write this run to a JSON file')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            scenarios = self.scenarios()
+            if options['only']:
+                scenarios = [s for s in scenarios if s[0] in options['only']]
+            results = {}
+            for name, user, method, url in scenarios:
+                results[name] = self.measure(user, method, url, options['repeat'], options['warm'])
+                results[name]['url'] = url
+                self.report(name, results[name])
+        finally:
+            teardown_test_environment()
+
+        failures = self.compare(results, options)
+
+        if options['output']:
+            self.write(options['output'], results)
+        if options['save_baseline']:
+            self.write(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+
+        if failures:
+            raise CommandError('Benchmark failures:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} views within budget'))
+
+    def scenarios(self):
+        now = timezone.now()
+        club = Club.objects.order_by('-member_count').first()
+        registration = EventRegistration.objects.filter(
+            user__userprofile__role='student', event__date__gte=now
+        ).select_related('user').order_by('id').first()
+        if club is None or registration is None:
+            raise CommandError('No data to benchmark: run generate_dataset (or create_sample_data) first')
+        student = registration.user
+        leader = ClubMembership.objects.filter(
+            club=club, role__in=['leader', 'faculty_advisor'], status='approved'
+        ).select_related('user').first()
+        manager = leader.user if leader else User.objects.filter(is_superuser=True).first()
+        event = Event.objects.filter(date__gte=now).order_by('-registration_count').first()
+        open_event = Event.objects.filter(date__gte=now, capacity=0).exclude(
+            registered_users=student
+        ).order_by('-registration_count').first() or event
+        other_club = Club.objects.exclude(members=student).order_by('-member_count').first() or club
+
+        return [
+            ('home', None, 'get', '/'),
+            ('club_list', student, 'get', '/clubs/'),
+            ('club_detail', student, 'get', f'/clubs/{club.id}/'),
+            ('event_list', student, 'get', '/events/'),
+            ('event_detail', student, 'get', f'/events/{event.id}/'),
+            ('search', student, 'get', f"/search/?q={club.name.split()[0]}"),
+            ('calendar', student, 'get', '/calendar/'),
+            ('calendar_month_json', student, 'get', f'/calendar/{now.year}/{now.month}.json'),
+            ('dashboard', student, 'get', '/dashboard/'),
+            ('profile', student, 'get', '/profile/'),
+            ('public_profile', student, 'get', f'/profile/{manager.username}/'),
+            ('member_list', student, 'get', f'/clubs/{club.id}/members/'),
+            ('club_manage', manager, 'get', f'/clubs/{club.id}/manage/'),
+            ('join_club', student, 'post', f'/clubs/{other_club.id}/join/'),
+            ('register_event', student, 'post', f'/events/{open_event.id}/register/'),
+        ]
+
+    def request(self, client, method, url):
+        # Writes are rolled back so every run sees the same database
+        with transaction.atomic():
+            response = getattr(client, method)(url)
+            if hasattr(response, 'streaming_content'):
+                b''.join(response.streaming_content)
+            transaction.set_rollback(True)
+        return response
+
+    def reset(self, user, warm):
+        if not warm:
+            cache.clear()
+            if user is not None:
+                evict_principal(user.pk)
+
+    def measure(self, user, method, url, repeat, warm):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+
+        # Untimed warm-up: imports, template compilation, connection setup
+        self.reset(user, warm)
+        response = self.request(client, method, url)
+        if response.status_code >= 400:
+            raise CommandError(f'{method.upper()} {url} returned {response.status_code}')
+
+        timings = []
+        queries = 0
+        for _ in range(max(repeat, 1)):
+            self.reset(user, warm)
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                self.request(client, method, url)
+                timings.append((time.perf_counter() - started) * 1000)
+            # SAVEPOINT/RELEASE from the rollback wrapper aren't the view's
+            queries = max(queries, sum(
+                1 for query in captured.captured_queries
+                if not query['sql'].startswith(('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT'))
+            ))
+
+        self.reset(user, warm)
+        tracemalloc.start()
+        try:
+            self.request(client, method, url)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'status': response.status_code,
+            'queries': queries,
+            'median_ms': round(statistics.median(timings), 2),
+            'max_ms': round(max(timings), 2),
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:<22} {result['status']:>3}  {result['queries']:>3} queries  "
+            f"{result['median_ms']:>8.1f} ms median  {result['max_ms']:>8.1f} ms max  "
+            f"{result['peak_kb']:>9.1f} KiB peak"
+        )
+
+    def compare(self, results, options):
+        failures = []
+        for name, result in results.items():
+            budget = QUERY_BUDGETS.get(name)
+            if budget is not None and result['queries'] > budget:
+                failures.append(f"{name}: {result['queries']} queries, budget is {budget}")
+
+        if options['save_baseline'] or not os.path.exists(options['baseline']):
+            return failures
+        with open(options['baseline']) as handle:
+            baseline = json.load(handle).get('views', {})
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if not previous:
+                continue
+            slower = result['median_ms'] - previous['median_ms']
+            if result['median_ms'] > previous['median_ms'] * options['threshold'] and slower > options['min_regression_ms']:
+                failures.append(
+                    f"{name}: {result['median_ms']:.1f} ms vs baseline {previous['median_ms']:.1f} ms"
+                )
+        return failures
+
+    def write(self, path, results):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        payload = {
+            'generated_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'counts': {
+                'users': User.objects.count(),
+                'clubs': Club.objects.count(),
+                'events': Event.objects.count(),
+                'registrations': EventRegistration.objects.count(),
+            },
+            'views': results,
+        }
+        with open(path, 'w') as handle:
+            json.dump(payload, handle, indent=2, sort_keys=True)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from clubs import recommendations
+
+class Command(BaseCommand):
+    help = 'Rebuilds the club co-membership similarity table used for recommendations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=recommendations.TOP_K,
+                            help='Neighbours to keep per club')
+
+    def handle(self, *args, **options):
+        rows = recommendations.rebuild(top_k=options['top_k'])
+        self.stdout.write(self.style.SUCCESS(f'Stored {rows} club similarity rows'))
@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from clubs import exports
+from clubs.models import Club, Event
+
+
+class Command(BaseCommand):
+    help = 'Streams an event registration list or club roster to a CSV/JSONL file or stdout'
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--event', type=int, help='Event id to export registrations for')
+        target.add_argument('--club', type=int, help='Club id to export memberships for')
+        parser.add_argument('--format', choices=sorted(exports.FORMATS), default='csv')
+        parser.add_argument('--status', choices=['pending', 'approved', 'rejected'],
+                            help='Only memberships with this status (clubs only)')
+        parser.add_argument('--output', '-o', help='File to write to (default: stdout)')
+
+    def handle(self, *args, **options):
+        fmt = options['format']
+        try:
+            if options['event']:
+                lines = exports.event_registrations(Event.objects.get(pk=options['event']), fmt)
+            else:
+                lines = exports.club_members(Club.objects.get(pk=options['club']), fmt, options['status'])
+        except (Event.DoesNotExist, Club.DoesNotExist) as exc:
+            raise CommandError(str(exc))
+
+        written = -1 if fmt == 'csv' else 0
+        out = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            for line in lines:
+                out.write(line)
+                written += 1
+        finally:
+            if options['output']:
+                out.close()
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {written} rows to {options['output']}"))
@@ -0,0 +1,256 @@
+import itertools
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from clubs import search
+from clubs.models import Club, ClubMembership, Event, EventRegistration, UserProfile
+
+DEPARTMENTS = [
+    'Computer Science', 'Electronics', 'Mechanical', 'Civil', 'Physics',
+    'Mathematics', 'Economics', 'Literature', 'Fine Arts', 'Biotechnology',
+]
+TOPICS = [
+    'Robotics', 'Chess', 'Film', 'Debate', 'Music', 'Photography', 'Drama', 'Coding',
+    'Hiking', 'Astronomy', 'Dance', 'Quiz', 'Cricket', 'Football', 'Design', 'Poetry',
+]
+EVENT_KINDS = ['Workshop', 'Meetup', 'Talk', 'Hackathon', 'Tournament', 'Screening', 'Showcase']
+LOCATIONS = ['Main Auditorium', 'Seminar Hall A', 'Seminar Hall B', 'Open Air Theatre', 'Library Lawn', 'Lab 101']
+CATEGORIES = [value for value, _ in Club.CATEGORY_CHOICES]
+
+
+def zipf_weights(n, skew):
+    # Popularity of the i-th most popular item falls off as 1 / i^skew
+    return list(itertools.accumulate(1.0 / (rank ** skew) for rank in range(1, n + 1)))
+
+
+def next_id(model):
+    return (model.objects.aggregate(top=Max('id'))['top'] or 0) + 1
+
+
+def insert_rows(model, columns, rows, batch_size):
+    # Straight executemany INSERTs: building a model instance per row costs
+    # far more than the insert itself at this volume. Values must already be
+    # in database form (see connection.ops.adapt_datetimefield_value).
+    quote = connection.ops.quote_name
+    names = ', '.join(quote(model._meta.get_field(name).column) for name in columns)
+    sql = f"INSERT INTO {quote(model._meta.db_table)} ({names}) VALUES ({', '.join(['%s'] * len(columns))})"
+    count = 0
+    rows = iter(rows)
+    with connection.cursor() as cursor:
+        while True:
+            chunk = list(itertools.islice(rows, batch_size))
+            if not chunk:
+                return count
+            cursor.executemany(sql, chunk)
+            count += len(chunk)
+
+
+def geometric(rng, mean):
+    # Small counts are common, long tail of heavy users
+    if mean <= 0:
+        return 0
+    p = 1.0 / (mean + 1)
+    count = 0
+    while rng.random() > p:
+        count += 1
+    return count
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generates a large synthetic dataset with power-law club and event popularity'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--clubs', type=int, default=200)
+        parser.add_argument('--events', type=int, default=20000)
+        parser.add_argument('--memberships-per-user', type=float, default=3.0,
+                            help='Mean number of clubs each student joins')
+        parser.add_argument('--registrations-per-user', type=float, default=5.0,
+                            help='Mean number of events each student registers for')
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Zipf exponent for club/event popularity')
+        parser.add_argument('--faculty-ratio', type=int, default=100,
+                            help='One faculty account per this many students')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='gen', help='Prefix for generated usernames')
+        parser.add_argument('--password', default='password123',
+                            help='Shared password for every generated account')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def log(self, message):
+        self.stdout.write(f'[{time.perf_counter() - self.started:6.1f}s] {message}')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        self.batch = options['batch_size']
+        prefix = options['prefix']
+        n_users, n_clubs, n_events = options['users'], options['clubs'], options['events']
+        if n_clubs < 1 or n_users < 1:
+            raise CommandError('Need at least one user and one club')
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f'Users with prefix "{prefix}_" already exist; pick another --prefix')
+
+        self.started = time.perf_counter()
+        now = timezone.now()
+        self.now = connection.ops.adapt_datetimefield_value(now)
+        # Hash once and share it: each hash is deliberately slow, and a
+        # per-user hash would dominate the run. Accounts still log in normally.
+        password = make_password(options['password'])
+
+        # Rows go in with raw INSERTs, so none of the per-row signals run:
+        # counters are computed here and written with the rows, and the
+        # search index is rebuilt once at the end.
+        with transaction.atomic():
+            students, faculty = self.create_users(rng, n_users, options['faculty_ratio'], prefix, password)
+            self.log(f'{len(students)} students, {len(faculty)} faculty')
+
+            club_weights = zipf_weights(n_clubs, options['skew'])
+            memberships = self.plan_memberships(rng, students, faculty, n_clubs, club_weights,
+                                                options['memberships_per_user'])
+            first_club = self.create_clubs(rng, n_clubs, memberships)
+            insert_rows(
+                ClubMembership,
+                ['user', 'club', 'role', 'status', 'joined_date', 'approved_date'],
+                ((user_id, first_club + index, role, status, self.now, self.now if status == 'approved' else None)
+                 for (user_id, index), (role, status) in memberships.items()),
+                self.batch,
+            )
+            self.log(f'{n_clubs} clubs, {len(memberships)} memberships')
+
+            first_event, registrations = self.create_events(
+                rng, n_events, first_club, club_weights, students,
+                options['registrations_per_user'], options['skew'], now,
+            )
+            self.log(f'{n_events} events')
+            insert_rows(
+                EventRegistration,
+                ['user', 'event', 'registered_at'],
+                ((user_id, first_event + index, self.now) for user_id, index in registrations),
+                self.batch,
+            )
+            self.log(f'{len(registrations)} registrations')
+
+            # Ids were assigned here, so move the sequences past them (no-op on SQLite)
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), [User, Club, Event]):
+                    cursor.execute(sql)
+
+            search.rebuild()
+            self.log('search index rebuilt')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done in {time.perf_counter() - self.started:.1f}s. Run build_recommendations to refresh '
+            f'club similarity for the new data.'
+        ))
+
+    def create_users(self, rng, n_users, faculty_ratio, prefix, password):
+        n_faculty = max(1, n_users // faculty_ratio) if faculty_ratio else 0
+        first = next_id(User)
+        ids = range(first, first + n_users + n_faculty)
+
+        def users():
+            for i, user_id in enumerate(ids):
+                kind = 'fac' if i >= n_users else 'stu'
+                username = f'{prefix}_{kind}{i}'
+                yield (user_id, username, password, f'{username}@college.edu', kind.title(), str(i),
+                       False, False, True, self.now)
+
+        def profiles():
+            for i, user_id in enumerate(ids):
+                is_faculty = i >= n_users
+                yield (user_id, '', rng.choice(DEPARTMENTS), 'faculty' if is_faculty else 'student',
+                       f'F{i:07d}' if is_faculty else None, None if is_faculty else f'S{i:07d}')
+
+        insert_rows(User, ['id', 'username', 'password', 'email', 'first_name', 'last_name',
+                           'is_superuser', 'is_staff', 'is_active', 'date_joined'], users(), self.batch)
+        insert_rows(UserProfile, ['user', 'bio', 'department', 'role', 'faculty_id', 'student_id'],
+                    profiles(), self.batch)
+        return list(ids[:n_users]), list(ids[n_users:])
+
+    def plan_memberships(self, rng, students, faculty, n_clubs, club_weights, mean):
+        # {(user_id, club index): (role, status)}, deduplicated per user
+        memberships = {}
+        for user_id in students:
+            count = min(geometric(rng, mean), n_clubs)
+            for index in set(rng.choices(range(n_clubs), cum_weights=club_weights, k=count)):
+                status = 'approved' if rng.random() < 0.85 else 'pending'
+                memberships[(user_id, index)] = ('member', status)
+        leaders = {}
+        for (user_id, index), (role, status) in memberships.items():
+            if status == 'approved' and index not in leaders:
+                leaders[index] = user_id
+        for index, user_id in leaders.items():
+            memberships[(user_id, index)] = ('leader', 'approved')
+        if faculty:
+            for index in range(n_clubs):
+                memberships[(faculty[index % len(faculty)], index)] = ('faculty_advisor', 'approved')
+        return memberships
+
+    def create_clubs(self, rng, n_clubs, memberships):
+        members = [0] * n_clubs
+        approved = [0] * n_clubs
+        for (_, index), (_, status) in memberships.items():
+            members[index] += 1
+            approved[index] += status == 'approved'
+        first = next_id(Club)
+        insert_rows(
+            Club,
+            ['id', 'name', 'description', 'category', 'created_at', 'member_count', 'approved_member_count'],
+            ((first + index, f'{rng.choice(TOPICS)} Society {index + 1}',
+              f'Synthetic club #{index + 1} for load testing.', rng.choice(CATEGORIES), self.now,
+              members[index], approved[index])
+             for index in range(n_clubs)),
+            self.batch,
+        )
+        return first
+
+    def create_events(self, rng, n_events, first_club, club_weights, students, mean, skew, now):
+        if not n_events:
+            return next_id(Event), set()
+        club_indexes = rng.choices(range(len(club_weights)), cum_weights=club_weights, k=n_events)
+        # Popular clubs run popular events; within a club, popularity is Pareto-ish
+        club_share = [club_weights[0]] + [b - a for a, b in zip(club_weights, club_weights[1:])]
+        event_weights = list(itertools.accumulate(
+            club_share[index] * rng.paretovariate(skew + 1) for index in club_indexes
+        ))
+
+        registrations = set()
+        for user_id in students:
+            count = min(geometric(rng, mean), n_events)
+            for index in rng.choices(range(n_events), cum_weights=event_weights, k=count):
+                registrations.add((user_id, index))
+        counts = [0] * n_events
+        for _, index in registrations:
+            counts[index] += 1
+
+        adapt = connection.ops.adapt_datetimefield_value
+        first = next_id(Event)
+
+        def events():
+            for index, club_index in enumerate(club_indexes):
+                date = now + timedelta(days=rng.randint(-180, 180), hours=rng.randint(8, 20))
+                # A quarter of events are capped, always above what they already hold
+                capacity = counts[index] + rng.randint(0, 20) if rng.random() < 0.25 else 0
+                deadline = adapt(date - timedelta(days=1)) if rng.random() < 0.5 else None
+                yield (first + index, f'{rng.choice(TOPICS)} {rng.choice(EVENT_KINDS)} #{index + 1}',
+                       'Synthetic event for load testing.', adapt(date), rng.choice(LOCATIONS),
+                       first_club + club_index, self.now,
+                       'approved' if rng.random() < 0.9 else 'pending', self.now,
+                       capacity, deadline, counts[index])
+
+        insert_rows(
+            Event,
+            ['id', 'title', 'description', 'date', 'location', 'club', 'created_at', 'status',
+             'approved_date', 'capacity', 'registration_deadline', 'registration_count'],
+            events(),
+            self.batch,
+        )
+        return first, registrations
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from clubs import images
+from clubs.models import Club, Event, UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Renders thumbnails and responsive variants for images uploaded before the pipeline existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing-only', action='store_true',
+                            help='Skip rows that already have a thumbnail')
+
+    def handle(self, *args, **options):
+        jobs = [(Club, 'image', 'thumbnail'), (Event, 'image', 'thumbnail'), (UserProfile, 'avatar', None)]
+        for model, field, thumbnail_field in jobs:
+            rows = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            if options['missing_only'] and thumbnail_field:
+                rows = rows.filter(**{thumbnail_field: ''})
+            done = 0
+            for pk, name in rows.values_list('pk', field).iterator():
+                thumbnail_dir = model._meta.get_field(thumbnail_field).upload_to if thumbnail_field else None
+                try:
+                    thumbnail, written = images.render(settings.MEDIA_ROOT, name, thumbnail_dir)
+                except (OSError, ValueError) as exc:
+                    self.stdout.write(self.style.WARNING(f'Skipped {model.__name__} {pk} ({name}): {exc}'))
+                    continue
+                images.remember_variants(name, written)
+                images._store_thumbnail(model, pk, field, name, thumbnail_field, thumbnail)
+                done += 1
+            self.stdout.write(self.style.SUCCESS(f'Processed {done} {model._meta.verbose_name_plural}'))
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from clubs import calendar_data
+from clubs.models import Club, ClubMembership, Event, EventWaitlist, UserProfile
+from clubs.recommendations import recommend_clubs
+from clubs.views import clubs_for, events_for
+
+
+def workload(user, club, event):
+    # The querysets behind the views and model helpers, as they are issued
+    now = timezone.now()
+    profile = user.userprofile
+    start, end = calendar_data.month_bounds(now.year, now.month)
+    user_clubs = Club.objects.filter(members=user)
+    return [
+        ('home: top clubs', Club.objects.order_by('-member_count')[:3]),
+        ('home: upcoming events', Event.objects.filter(date__gte=now).order_by('date')[:5]),
+        ('club_list page', clubs_for(user).order_by('name', 'id')[:13]),
+        ('club_list by category', Club.objects.filter(category=club.category).order_by('name')),
+        ('event_list page', events_for(user).filter(date__gte=now).order_by('date', 'id')[:13]),
+        ('approved upcoming events', Event.objects.filter(date__gte=now, status='approved').order_by('date')[:20]),
+        ('club_detail events', club.events.filter(date__gte=now).order_by('date')),
+        ('club_manage events', Event.objects.filter(club=club).order_by('-date')),
+        ('club_manage pending', ClubMembership.objects.filter(club=club, status='pending')),
+        ('club_manage members', ClubMembership.objects.filter(club=club, status='approved')),
+        ('calendar month', Event.objects.filter(date__gte=start, date__lt=end).order_by('date', 'id')),
+        ('dashboard: my events', Event.objects.filter(registered_users=user, date__gte=now).order_by('date')),
+        ('dashboard: my clubs', user_clubs),
+        ('get_recommended_events', Event.objects.filter(
+            club__in=user_clubs, date__gt=now).exclude(registered_users=user).order_by('date')[:5]),
+        ('get_recommended_events fallback', Event.objects.filter(
+            date__gt=now).exclude(registered_users=user).order_by('-registration_count')[:5]),
+        ('get_recommended_clubs', recommend_clubs(user)),
+        ('get_recommended_clubs fallback', Club.objects.exclude(members=user).order_by('-member_count')[:5]),
+        ('get_led_clubs', profile.get_led_clubs()),
+        ('get_advised_clubs', profile.get_advised_clubs()),
+        ('club leaders', ClubMembership.objects.filter(club=club, role='leader', status='approved')),
+        ('permissions.club_roles', ClubMembership.objects.filter(user=user).values_list('club_id', 'role', 'status')),
+        ('waitlist head', EventWaitlist.objects.filter(event=event).order_by('id')[:1]),
+    ]
+
+
+def sqlite_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[3] for row in cursor.fetchall()]
+
+
+def problems(plan):
+    found = []
+    for step in plan:
+        if step.startswith('SCAN ') and ' USING ' not in step:
+            found.append(f'full scan: {step}')
+        elif 'TEMP B-TREE' in step:
+            found.append(f'sort: {step}')
+    return found
+
+
+class Command(BaseCommand):
+    help = 'Explains the hot querysets and reports full table scans and temporary sorts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not just problems')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(userprofile__role='student', clubmembership__isnull=False).first()
+        club = Club.objects.order_by('-member_count').first()
+        event = Event.objects.order_by('-registration_count').first()
+        if not (user and club and event):
+            raise CommandError('Needs some data: run generate_dataset (or create_sample_data) first')
+        UserProfile.objects.get_or_create(user=user)
+
+        flagged = 0
+        for name, queryset in workload(user, club, event):
+            if connection.vendor != 'sqlite':
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.stdout.write(queryset.explain())
+                continue
+            plan = sqlite_plan(queryset)
+            issues = problems(plan)
+            flagged += bool(issues)
+            status = self.style.WARNING('CHECK') if issues else self.style.SUCCESS('ok   ')
+            self.stdout.write(f'{status} {name}')
+            for line in (plan if options['verbose_plans'] else issues):
+                self.stdout.write(f'        {line}')
+
+        if connection.vendor == 'sqlite':
+            self.stdout.write(f'{flagged} of {len(workload(user, club, event))} querysets need a look')
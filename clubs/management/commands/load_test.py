@@ -0,0 +1,160 @@
+import asyncio
+import json
+import queue
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from clubs.models import Club, Event, EventRegistration
+
+PATHS = ('wsgi', 'asgi')
+
+
+def summarise(latencies, elapsed, errors):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {'requests': 0, 'errors': errors, 'rps': 0.0, 'p50_ms': 0.0, 'p99_ms': 0.0}
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 2)
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': percentile(0.50),
+        'p99_ms': percentile(0.99),
+    }
+
+
+class Command(BaseCommand):
+    help = ('Load-tests the read-only pages through the WSGI handler (a thread per concurrent '
+            'client) and through the ASGI handler with the async views (one event loop), '
+            'and compares requests/sec and latency percentiles')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per page per path')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--path', choices=PATHS, help='Only test one handler')
+        parser.add_argument('--only', nargs='+', help='Only these pages')
+        parser.add_argument('--output', help='Also write the results to a JSON file')
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            raise CommandError('Run this against a file-backed database; threads cannot share an in-memory one')
+        setup_test_environment()
+        try:
+            user, pages = self.pages()
+            if options['only']:
+                pages = [page for page in pages if page[0] in options['only']]
+            results = {}
+            for name, url in pages:
+                urls = [url] * options['requests']
+                results[name] = {}
+                for path in ([options['path']] if options['path'] else PATHS):
+                    if path == 'wsgi':
+                        result = self.run_wsgi(user, urls, options['concurrency'])
+                    else:
+                        result = asyncio.run(self.run_asgi(user, urls, options['concurrency']))
+                    results[name][path] = result
+                    self.report(name, path, result)
+        finally:
+            teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(results, handle, indent=2, sort_keys=True)
+
+    def pages(self):
+        now = timezone.now()
+        registration = EventRegistration.objects.filter(
+            user__userprofile__role='student', event__date__gte=now
+        ).select_related('user').order_by('id').first()
+        club = Club.objects.order_by('-member_count').first()
+        event = Event.objects.filter(date__gte=now).order_by('-registration_count').first()
+        if registration is None or club is None or event is None:
+            raise CommandError('No data to test: run generate_dataset (or create_sample_data) first')
+        return registration.user, [
+            ('home', '/'),
+            ('club_list', '/clubs/'),
+            ('club_detail', f'/clubs/{club.id}/'),
+            ('event_list', '/events/'),
+            ('event_detail', f'/events/{event.id}/'),
+            ('calendar', '/calendar/'),
+        ]
+
+    def run_wsgi(self, user, urls, concurrency):
+        # Like a threaded WSGI server: each worker thread serves one request at a time
+        work = queue.SimpleQueue()
+        for url in urls:
+            work.put(url)
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker(client):
+            try:
+                while True:
+                    try:
+                        url = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    started = time.perf_counter()
+                    status = client.get(url).status_code
+                    with lock:
+                        latencies.append(time.perf_counter() - started)
+                        if status != 200:
+                            errors.append(status)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        clients = []
+        for _ in range(concurrency):
+            client = Client()
+            client.force_login(user)
+            clients.append(client)
+        threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return summarise(latencies, time.perf_counter() - started, len(errors))
+
+    async def run_asgi(self, user, urls, concurrency):
+        # Like an ASGI server: every request in flight shares one event loop
+        with override_settings(ROOT_URLCONF='collegehub.asgi_urls'):
+            work = asyncio.Queue()
+            for url in urls:
+                work.put_nowait(url)
+            latencies = []
+            errors = []
+
+            async def worker(client):
+                while not work.empty():
+                    url = work.get_nowait()
+                    started = time.perf_counter()
+                    response = await client.get(url)
+                    latencies.append(time.perf_counter() - started)
+                    if response.status_code != 200:
+                        errors.append(response.status_code)
+
+            clients = []
+            for _ in range(concurrency):
+                client = AsyncClient()
+                await client.aforce_login(user)
+                clients.append(client)
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(client) for client in clients))
+            return summarise(latencies, time.perf_counter() - started, len(errors))
+
+    def report(self, name, path, result):
+        self.stdout.write(
+            f"{name:<14} {path:<5} {result['requests']:>5} requests  {result['rps']:>8.1f} req/s  "
+            f"p50 {result['p50_ms']:>8.1f} ms  p99 {result['p99_ms']:>8.1f} ms  {result['errors']} errors"
+        )
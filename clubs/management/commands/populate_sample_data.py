@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
 from django.utils import timezone
-from clubs.models import Club, Event, Member
+from clubs.models import Club, Event, ClubMembership
 from datetime import timedelta
 
 class Command(BaseCommand):
@@ -31,16 +32,29 @@ class Command(BaseCommand):
             club = Club.objects.create(**club_data)
             self.stdout.write(f'Created club: {club.name}')
 
-            # Create members for each club
+            # Create members for each club; the president leads it
             member_roles = ['President', 'Vice President', 'Secretary', 'Treasurer', 'Member']
+            club_slug = club.name.lower().replace(' ', '').replace('&', '')
             for i, role in enumerate(member_roles, 1):
-                member = Member.objects.create(
-                    name=f'{club.name} {role}',
-                    email=f'{role.lower().replace(" ", "")}@{club.name.lower().replace(" ", "")}.com',
+                role_slug = role.lower().replace(' ', '')
+                user, _ = User.objects.get_or_create(
+                    username=f'{club_slug}_{role_slug}',
+                    defaults={
+                        'email': f'{role_slug}@{club_slug}.com',
+                        'first_name': club.name,
+                        'last_name': role,
+                    }
+                )
+                ClubMembership.objects.get_or_create(
+                    user=user,
                     club=club,
-                    role=role
+                    defaults={
+                        'role': 'leader' if role == 'President' else 'member',
+                        'status': 'approved',
+                        'approved_date': timezone.now(),
+                    }
                 )
-                self.stdout.write(f'Created member: {member.name}')
+                self.stdout.write(f'Created member: {user.get_full_name()}')
 
         # Create sample events
         now = timezone.now()
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+from clubs.sessions import PURGE_BATCH_SIZE, SessionStore
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired sessions in small batches, leaving the table writable in between'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PURGE_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        deleted = SessionStore.clear_expired(batch_size=options['batch_size'], pause=options['pause'])
+        self.stdout.write(f'Deleted {deleted} expired sessions in {time.perf_counter() - started:.1f}s')
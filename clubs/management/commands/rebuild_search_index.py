@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from clubs import search
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index for clubs and events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not search.is_enabled():
+            self.stdout.write(self.style.WARNING(
+                f'Full-text search is not available on {connection.vendor}; searches fall back to icontains.'
+            ))
+            return
+        with transaction.atomic():
+            search.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from clubs import objects, page_cache
+from clubs.models import Club, ClubMembership, Event, EventRegistration
+
+
+def _count(queryset, field):
+    counts = queryset.filter(**{field: OuterRef('pk')}).values(field).annotate(n=Count('pk')).values('n')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the cached member and registration counters on clubs and events'
+
+    def handle(self, *args, **kwargs):
+        memberships = ClubMembership.objects.all()
+        club_counts = {
+            'member_count': _count(memberships, 'club'),
+            'approved_member_count': _count(memberships.filter(status='approved'), 'club'),
+        }
+        event_counts = {'registration_count': _count(EventRegistration.objects.all(), 'event')}
+        with transaction.atomic():
+            # Only rows that drifted are rewritten, so only their caches are dropped
+            clubs = list(Club.objects.annotate(
+                actual_members=club_counts['member_count'],
+                actual_approved=club_counts['approved_member_count'],
+            ).exclude(
+                member_count=F('actual_members'), approved_member_count=F('actual_approved'),
+            ).values_list('pk', flat=True))
+            events = list(Event.objects.annotate(
+                actual_registrations=event_counts['registration_count'],
+            ).exclude(
+                registration_count=F('actual_registrations'),
+            ).values_list('pk', 'club_id'))
+            Club.objects.filter(pk__in=clubs).update(**club_counts)
+            Event.objects.filter(pk__in=[pk for pk, _ in events]).update(**event_counts)
+
+            # What the counter signals in clubs.signals would have invalidated
+            for pk in clubs:
+                objects.invalidate(Club, pk)
+            for pk, _ in events:
+                objects.invalidate(Event, pk)
+            names = [f'club:{pk}' for pk in clubs] + [f'event:{pk}' for pk, _ in events]
+            if clubs:
+                names.append('clubs')
+            transaction.on_commit(lambda: page_cache.invalidate(*names))
+        self.stdout.write(self.style.SUCCESS(f'Corrected the counters on {len(clubs)} clubs and {len(events)} events'))
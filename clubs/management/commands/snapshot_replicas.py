@@ -0,0 +1,50 @@
+import json
+import os
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from clubs import routing
+
+
+class Command(BaseCommand):
+    help = ('Copies the primary SQLite database into each replica in DATABASE_REPLICAS with the '
+            'online backup API, once or every --interval seconds')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help='Keep running, refreshing every N seconds')
+
+    def handle(self, *args, **options):
+        if not routing.REPLICAS:
+            raise CommandError('No replicas configured; set DATABASE_REPLICAS (e.g. DATABASE_REPLICAS=2)')
+        primary = connections.settings[DEFAULT_DB_ALIAS]
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('Snapshots only work for SQLite; use the database server\'s own replication')
+
+        while True:
+            for alias in routing.REPLICAS:
+                self.snapshot(primary['NAME'], alias)
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def snapshot(self, source_path, alias):
+        target_path = connections.settings[alias]['NAME']
+        os.makedirs(os.path.dirname(target_path) or '.', exist_ok=True)
+        # Anything committed after this moment may be missing from the copy
+        started = time.time()
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path)
+        try:
+            # Readers of the replica keep their snapshot while it is replaced
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+        marker = routing.snapshot_marker(alias)
+        with open(f'{marker}.tmp', 'w') as handle:
+            json.dump({'synced_at': started}, handle)
+        os.replace(f'{marker}.tmp', marker)
+        self.stdout.write(f'{alias}: {time.time() - started:.2f}s')
@@ -0,0 +1,79 @@
+import threading
+import time
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from clubs.models import Club, Event, EventRegistration
+
+
+class Command(BaseCommand):
+    help = 'Fires concurrent registrations at one event and checks capacity is never exceeded'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--capacity', type=int, default=25)
+        parser.add_argument('--users', type=int, default=200, help='Distinct users competing for seats')
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--keep', action='store_true', help='Leave the generated rows in place')
+
+    def handle(self, *args, **options):
+        if options['capacity'] < 1:
+            raise CommandError('--capacity must be at least 1')
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            raise CommandError('Run this against a file-backed database; threads cannot share an in-memory one')
+
+        stamp = int(time.time() * 1000)
+        club = Club.objects.create(name=f'stress-{stamp}', description='Registration stress test')
+        event = Event.objects.create(
+            title=f'stress-{stamp}',
+            description='Registration stress test',
+            date=timezone.now() + datetime.timedelta(days=1),
+            location='Nowhere',
+            club=club,
+            capacity=options['capacity'],
+        )
+        users = User.objects.bulk_create([
+            User(username=f'stress-{stamp}-{i}') for i in range(options['users'])
+        ])
+        # Every user tries twice so duplicate handling is exercised as well
+        attempts = [user for user in users for _ in range(2)]
+        results = {}
+        lock = threading.Lock()
+
+        def worker(chunk):
+            try:
+                target = Event.objects.get(pk=event.pk)
+                for user in chunk:
+                    result = target.register(user)
+                    with lock:
+                        results[result] = results.get(result, 0) + 1
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(attempts[i::options['threads']],))
+            for i in range(options['threads'])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        event.refresh_from_db()
+        rows = EventRegistration.objects.filter(event=event).count()
+        self.stdout.write(
+            f'{len(attempts)} attempts in {elapsed:.2f}s: {results}; '
+            f'{rows} rows, counter {event.registration_count}, capacity {event.capacity}'
+        )
+        try:
+            if rows != event.capacity or event.registration_count != rows:
+                raise CommandError('Capacity violated or counter out of step with registrations')
+        finally:
+            if not options['keep']:
+                club.delete()
+                User.objects.filter(pk__in=[user.pk for user in users]).delete()
+        self.stdout.write(self.style.SUCCESS('Capacity held under concurrent registration'))
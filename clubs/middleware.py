@@ -0,0 +1,157 @@
+import json
+import logging
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import routing
+
+logger = logging.getLogger('clubs.sql')
+
+# Same statement shape repeated more than this many times in one request is
+# reported as a likely N+1 (a query issued per row of some loop)
+N_PLUS_ONE_THRESHOLD = getattr(settings, 'SQL_INSTRUMENTATION_N_PLUS_ONE', 5)
+
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def fingerprint(sql):
+    # Django passes parameters separately, so the SQL is mostly normalised
+    # already; fold variable-length IN lists and stray literals as well.
+    return LITERAL_RE.sub('?', IN_LIST_RE.sub('IN (...)', sql))
+
+
+def _origin():
+    # Nearest template node being rendered, else the nearest project frame
+    frame = sys._getframe(3)
+    code_frame = None
+    while frame is not None:
+        if frame.f_code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            token = getattr(node, 'token', None)
+            origin = getattr(node, 'origin', None)
+            if token is not None and origin is not None:
+                return f'{origin.template_name or origin.name}:{token.lineno}'
+        filename = frame.f_code.co_filename
+        if code_frame is None and 'site-packages' not in filename and not filename.endswith('middleware.py') \
+                and 'lib/python' not in filename:
+            code_frame = f'{filename}:{frame.f_lineno}'
+        frame = frame.f_back
+    return code_frame
+
+
+class RequestQueries:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        self.shapes = Counter()
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            shape = fingerprint(sql)
+            self.shapes[shape] += 1
+            try:
+                self.statements[(sql, repr(params))] += 1
+            except Exception:
+                pass
+            # The second hit is where a loop shows itself
+            if self.shapes[shape] == 2:
+                self.origins[shape] = _origin()
+
+    def duplicates(self):
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+    def n_plus_one(self):
+        return [
+            {'sql': shape[:300], 'count': n, 'origin': self.origins.get(shape)}
+            for shape, n in self.shapes.most_common()
+            if n > N_PLUS_ONE_THRESHOLD
+        ]
+
+
+class QueryInstrumentationMiddleware:
+    # Opt-in via SQL_INSTRUMENTATION = True. When off, Django drops the
+    # middleware at startup, so requests don't pay for it at all.
+    def __init__(self, get_response):
+        if not getattr(settings, 'SQL_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = RequestQueries()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+            # Streaming bodies run their queries after this point; only what
+            # happened before the first byte is counted for them.
+        total = time.perf_counter() - started
+
+        suspects = queries.n_plus_one()
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={queries.duration * 1000:.1f};desc="{queries.count} queries"',
+            f'total;dur={total * 1000:.1f}',
+        ])
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': queries.count,
+            'db_ms': round(queries.duration * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+            'duplicates': queries.duplicates(),
+            'n_plus_one': suspects,
+        }
+        if suspects:
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+        return response
+
+
+class ReplicaMiddleware:
+    # Routes the reads of @replica_reads views to a fresh replica (see
+    # clubs.routing) and pins clients to the primary for a while after they
+    # write. Unused when no replicas are configured.
+    def __init__(self, get_response):
+        if not routing.REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.read_database = None
+        with routing.use_database(None):
+            response = self.get_response(request)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            routing.pin_primary(response)
+        elif request.read_database is not None:
+            response['X-Read-Database'] = request.read_database
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ('GET', 'HEAD') or not getattr(view_func, 'replica_reads', False):
+            return None
+        if routing.is_pinned(request):
+            return None
+        alias = routing.pick_replica()
+        if alias is not None:
+            # Load the session and user from the primary before switching over
+            request.user.is_authenticated
+            routing.route_reads(alias)
+            request.read_database = alias
+        return None
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# Self-contained on purpose: the live clubs.search module and models may
+# change after this migration, so the tables and backfill are spelled out
+# here against the historical models.
+INDEXES = {
+    'Club': ('clubs_club_fts', ('name', 'description')),
+    'Event': ('clubs_event_fts', ('title', 'description', 'location')),
+}
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for model_name, (table, columns) in INDEXES.items():
+        source = apps.get_model('clubs', model_name)._meta.db_table
+        schema_editor.execute(f'DROP TABLE IF EXISTS {table}')
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {table} USING fts5({', '.join(columns)}, "
+            f"tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {table} (rowid, {', '.join(columns)}) "
+            f"SELECT id, {', '.join(columns)} FROM {source}"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, _ in INDEXES.values():
+        schema_editor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
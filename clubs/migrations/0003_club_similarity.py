@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0002_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClubSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('club', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbours', to='clubs.club')),
+                ('neighbour', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbour_of', to='clubs.club')),
+            ],
+            options={
+                'unique_together': {('club', 'neighbour')},
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:26
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def _count(queryset, field):
+    counts = queryset.filter(**{field: OuterRef('pk')}).values(field).annotate(n=Count('pk')).values('n')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def backfill_counters(apps, schema_editor):
+    Club = apps.get_model('clubs', 'Club')
+    Event = apps.get_model('clubs', 'Event')
+    ClubMembership = apps.get_model('clubs', 'ClubMembership')
+    EventRegistration = apps.get_model('clubs', 'EventRegistration')
+    Club.objects.update(
+        member_count=_count(ClubMembership.objects.all(), 'club'),
+        approved_member_count=_count(ClubMembership.objects.filter(status='approved'), 'club'),
+    )
+    Event.objects.update(registration_count=_count(EventRegistration.objects.all(), 'event'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0003_club_similarity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='club',
+            name='approved_member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='registration_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    # One-off repair for accounts created without a profile (raw fixture
+    # loads, users older than the post_save signal); every view expects one
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserProfile = apps.get_model('clubs', 'UserProfile')
+    db = schema_editor.connection.alias
+    missing = User.objects.using(db).filter(userprofile__isnull=True).values_list('pk', flat=True)
+    UserProfile.objects.using(db).bulk_create(
+        [UserProfile(user_id=pk) for pk in missing.iterator()], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0008_notification_feed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,26 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Q
 from django.contrib.auth.models import User
-from django.db.models import Count
+from django.utils import timezone
 
-class Club(models.Model):
+class CounterFieldsMixin:
+    # Denormalised counters only ever change through F() updates. A full
+    # save() of an existing row would write back the values read at load
+    # time and lose every join or registration committed since, so they
+    # are left out unless update_fields names them.
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+class Club(CounterFieldsMixin, models.Model):
     CATEGORY_CHOICES = [
         ('technical', 'Technical'),
         ('cultural', 'Cultural'),
@@ -17,6 +35,10 @@ class Club(models.Model):
     image = models.ImageField(upload_to='club_images/', null=True, blank=True)
     thumbnail = models.ImageField(upload_to='club_thumbnails/', null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Denormalised counters, kept in step by clubs.signals (see recount command)
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+    approved_member_count = models.PositiveIntegerField(default=0, editable=False)
+    counter_fields = ('member_count', 'approved_member_count')
     members = models.ManyToManyField(
         User,
         through='ClubMembership',
@@ -24,30 +46,45 @@ class Club(models.Model):
         related_name='joined_clubs'
     )
 
+    class Meta:
+        # Workload indexes, see the index_advisor command
+        indexes = [
+            models.Index(fields=['-member_count']),
+            models.Index(fields=['name']),
+            models.Index(fields=['category', 'name']),
+        ]
+
     def get_registered_count(self):
-        return self.members.count()
+        return self.member_count
 
     @classmethod
     def get_recommended_clubs(cls, user):
-        # Get user's interests based on their current clubs
-        user_interests = cls.objects.filter(members=user).values_list('category', flat=True)
-        
-        # Find popular clubs in same categories that user hasn't joined
-        recommended = cls.objects.exclude(members=user)\
-            .filter(category__in=user_interests)\
-            .annotate(member_count=Count('members'))\
-            .order_by('-member_count')[:5]
-        
-        # If no recommendations based on interests, return popular clubs
+        from .recommendations import recommend_clubs
+
+        # Precomputed co-membership neighbours of the user's clubs and interests
+        recommended = recommend_clubs(user, limit=5)
+
+        # Until the similarity table has neighbours for them, return popular clubs
         if not recommended:
             recommended = cls.objects.exclude(members=user)\
-                .annotate(member_count=Count('members'))\
                 .order_by('-member_count')[:5]
         return recommended
 
     def __str__(self):
         return self.name
 
+class ClubSimilarity(models.Model):
+    # Top-K co-membership neighbours per club, maintained by clubs.recommendations
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='neighbours')
+    neighbour = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='neighbour_of')
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = ('club', 'neighbour')
+
+    def __str__(self):
+        return f"{self.club.name} ~ {self.neighbour.name} ({self.score:.3f})"
+
 class ClubMembership(models.Model):
     ROLE_CHOICES = [
         ('member', 'Member'),
@@ -71,6 +108,19 @@ class ClubMembership(models.Model):
 
     class Meta:
         unique_together = ('user', 'club')
+        indexes = [
+            # Moderation lists: one club's pending / approved rows
+            models.Index(fields=['club', 'status']),
+            # Role lookups per user; also covers clubs.permissions.club_roles
+            models.Index(fields=['user', 'role', 'status', 'club']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so signals can tell approvals apart
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
 
     def __str__(self):
         return f"{self.user.username} - {self.club.name} ({self.role})"
@@ -84,7 +134,7 @@ class ClubMembership(models.Model):
     def is_faculty_advisor(self):
         return self.role == 'faculty_advisor' and self.status == 'approved'
 
-class Event(models.Model):
+class Event(CounterFieldsMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending Approval'),
         ('approved', 'Approved'),
@@ -93,7 +143,7 @@ class Event(models.Model):
     
     title = models.CharField(max_length=200)
     description = models.TextField()
-    date = models.DateTimeField()
+    date = models.DateTimeField(db_index=True)
     location = models.CharField(max_length=200)
     club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='events')
     image = models.ImageField(upload_to='event_images/', null=True, blank=True)
@@ -106,10 +156,94 @@ class Event(models.Model):
     registered_users = models.ManyToManyField(User, through='EventRegistration')
     capacity = models.PositiveIntegerField(default=0)  # 0 means unlimited
     registration_deadline = models.DateTimeField(null=True, blank=True)
+    registration_count = models.PositiveIntegerField(default=0, editable=False)
+    counter_fields = ('registration_count',)
+
+    class Meta:
+        indexes = [
+            # A club's events in date order (club page, club_manage)
+            models.Index(fields=['club', 'date']),
+            # Approved events in a date range
+            models.Index(fields=['status', 'date']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored date so a move invalidates the old month too
+        instance._loaded_date = instance.__dict__.get('date')
+        return instance
     
     @property
     def is_full(self):
-        return self.capacity > 0 and self.registered_users.count() >= self.capacity
+        return self.capacity > 0 and self.registration_count >= self.capacity
+
+    def register(self, user, enforce_deadline=True):
+        # Claim a seat with a single conditional UPDATE, so capacity holds no
+        # matter how many requests race for the last one, then insert the row.
+        # A duplicate trips unique_together and rolls the seat back with it.
+        now = timezone.now()
+        seats = Event.objects.filter(
+            Q(capacity=0) | Q(registration_count__lt=F('capacity')),
+            pk=self.pk,
+            date__gte=now,
+        )
+        if enforce_deadline:
+            seats = seats.filter(Q(registration_deadline__isnull=True) | Q(registration_deadline__gte=now))
+        try:
+            with transaction.atomic():
+                reserved = seats.update(registration_count=F('registration_count') + 1)
+                if reserved:
+                    registration = EventRegistration(user=user, event=self)
+                    registration._seat_reserved = True
+                    registration.save()
+                    return 'registered'
+        except IntegrityError:
+            return 'duplicate'
+
+        # Nothing was claimed: re-read the event to report why. Someone who
+        # already holds a seat hears that before being told it is full.
+        if EventRegistration.objects.filter(user=user, event=self).exists():
+            return 'duplicate'
+        self.refresh_from_db(fields=['date', 'registration_deadline', 'capacity', 'registration_count'])
+        if self.date < now:
+            return 'passed'
+        if enforce_deadline and self.registration_deadline and self.registration_deadline < now:
+            return 'closed'
+        return 'full'
+
+    def join_waitlist(self, user):
+        # Returns the queue position, or None if the user already has a seat
+        if EventRegistration.objects.filter(user=user, event=self).exists():
+            return None
+        try:
+            with transaction.atomic():
+                entry = EventWaitlist.objects.create(user=user, event=self)
+        except IntegrityError:
+            entry = EventWaitlist.objects.get(user=user, event=self)
+        return entry.position()
+
+    def cancel_registration(self, user):
+        # Hand the freed seat to the head of the waitlist in the same
+        # transaction, so it is never visible as free to anyone else.
+        with transaction.atomic():
+            deleted, _ = EventRegistration.objects.filter(user=user, event=self).delete()
+            if deleted:
+                self.promote_waitlist()
+        return bool(deleted)
+
+    def promote_waitlist(self):
+        while True:
+            entry = self.waitlist_entries.select_related('user').order_by('id').first()
+            if entry is None:
+                return None
+            # People already queued keep their place even once the deadline passes
+            result = self.register(entry.user, enforce_deadline=False)
+            if result == 'full' or result == 'passed':
+                return None
+            entry.delete()
+            if result == 'registered':
+                return entry.user
 
     @classmethod
     def get_recommended_events(cls, user):
@@ -131,9 +265,7 @@ class Event(models.Model):
                 date__gt=timezone.now()
             ).exclude(
                 registered_users=user
-            ).annotate(
-                reg_count=Count('registered_users')
-            ).order_by('-reg_count')[:5]
+            ).order_by('-registration_count')[:5]
         
         return recommended
 
@@ -151,6 +283,23 @@ class EventRegistration(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.event.title}"
 
+class EventWaitlist(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='waitlist_entries')
+    joined_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('user', 'event')
+        # Queue order is insertion order; this index makes both the head
+        # lookup and a position count a range scan within one event.
+        indexes = [models.Index(fields=['event', 'id'])]
+
+    def __str__(self):
+        return f"{self.user.username} waiting for {self.event.title}"
+
+    def position(self):
+        return EventWaitlist.objects.filter(event_id=self.event_id, id__lte=self.id).count()
+
 class UserProfile(models.Model):
     ROLE_CHOICES = [
         ('student', 'Student'),
@@ -167,6 +316,34 @@ class UserProfile(models.Model):
     student_id = models.CharField(max_length=50, blank=True, null=True)
     interests = models.ManyToManyField('Club', related_name='interested_users', blank=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._field_values(field_names)
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = self._field_values()
+
+    def _field_values(self, names=None):
+        values = {}
+        for field in self._meta.concrete_fields:
+            if names is not None and field.attname not in names:
+                continue
+            value = getattr(self, field.attname)
+            if isinstance(field, models.FileField):
+                value = value.name or None
+            values[field.attname] = value
+        return values
+
+    def is_dirty(self):
+        # Unsaved profiles are always dirty; loaded ones only if a field moved
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return True
+        return self._field_values(loaded) != loaded
+
     def __str__(self):
         return f"{self.user.username}'s profile"
 
@@ -179,33 +356,21 @@ class UserProfile(models.Model):
     def is_student(self):
         return self.role == 'student'
 
+    # Role checks go through the per-request resolver in clubs.permissions
     def is_club_leader(self, club=None):
+        from . import permissions
         if club:
-            return ClubMembership.objects.filter(
-                user=self.user, 
-                club=club, 
-                role='leader',
-                status='approved'
-            ).exists()
-        return ClubMembership.objects.filter(
-            user=self.user, 
-            role='leader',
-            status='approved'
-        ).exists()
+            return permissions.is_leader(self.user, club)
+        return permissions.has_any_role(self.user, 'leader')
 
     def is_club_faculty_advisor(self, club=None):
+        from . import permissions
         if club:
-            return ClubMembership.objects.filter(
-                user=self.user, 
-                club=club, 
-                role='faculty_advisor',
-                status='approved'
-            ).exists()
-        return ClubMembership.objects.filter(
-            user=self.user, 
-            role='faculty_advisor',
-            status='approved'
-        ).exists()
+            return permissions.is_faculty_advisor(self.user, club)
+        return permissions.has_any_role(self.user, 'faculty_advisor')
+
+    def is_faculty_advisor(self, club):
+        return self.is_club_faculty_advisor(club)
 
     def get_led_clubs(self):
         return Club.objects.filter(
@@ -242,3 +407,40 @@ class UserProfile(models.Model):
 
     def can_delete_club(self, club):
         return self.is_admin() or (self.is_faculty() and self.is_club_faculty_advisor(club))
+
+class ClubActivity(models.Model):
+    # One row per thing that happened in a club, however many members it has.
+    # Feeds are put together from these when read (clubs.notifications).
+    KIND_CHOICES = [
+        ('event_approved', 'Event approved'),
+        ('membership_approved', 'Membership approved'),
+        ('leader_assigned', 'Leader assigned'),
+    ]
+    # Only shown to the member they are about, not the whole club
+    PERSONAL_KINDS = ('membership_approved',)
+
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='activities')
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    subject = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # Newest-first streams per club and per member, read by id range
+        indexes = [
+            models.Index(fields=['club', 'id']),
+            models.Index(fields=['subject', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} in {self.club.name}"
+
+class FeedCursor(models.Model):
+    # Newest activity id the user has seen; everything above it is unread
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='feed_cursor')
+    last_read_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} read up to {self.last_read_id}"
@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import dashboard, notifications, objects, page_cache, recommendations
+from .models import Club, ClubMembership
+from .signals import suppress_membership_signals
+
+ACTIONS = ('approve', 'reject', 'remove')
+
+
+def _targets(club, action, membership_ids=None, all_pending=False):
+    memberships = ClubMembership.objects.filter(club=club)
+    if all_pending:
+        memberships = memberships.filter(status='pending')
+    else:
+        memberships = memberships.filter(id__in=membership_ids or [])
+    if action == 'approve':
+        return memberships.exclude(status='approved')
+    # Faculty advisors can't be rejected or removed from here
+    memberships = memberships.exclude(role='faculty_advisor')
+    if action == 'reject':
+        return memberships.exclude(status='rejected')
+    return memberships
+
+
+def moderate(club, action, moderator, membership_ids=None, all_pending=False):
+    # Applies one action to many memberships with a single UPDATE/DELETE.
+    # The per-row signals are skipped (UPDATE never sends them, and removals
+    # run under suppress_membership_signals), so the side effects they would
+    # have had (counters, dashboard and page cache versions, recommendations)
+    # are applied here once for the whole batch. Returns the number of rows
+    # changed.
+    if action not in ACTIONS:
+        raise ValueError(f'Unknown moderation action: {action}')
+
+    with transaction.atomic():
+        targets = _targets(club, action, membership_ids, all_pending)
+        # Lock the batch and note what the counters need before changing it
+        rows = list(targets.select_for_update().values_list('user_id', 'status'))
+        if not rows:
+            return 0
+        user_ids = {user_id for user_id, _ in rows}
+        was_approved = sum(1 for _, status in rows if status == 'approved')
+
+        if action == 'approve':
+            changed = targets.update(status='approved', approved_by=moderator, approved_date=timezone.now())
+            counters = {'approved_member_count': F('approved_member_count') + changed}
+            notifications.record_many('membership_approved', club, moderator, user_ids)
+        elif action == 'reject':
+            changed = targets.update(status='rejected')
+            counters = {'approved_member_count': F('approved_member_count') - was_approved}
+        else:
+            with suppress_membership_signals():
+                _, deleted = targets.delete()
+            changed = deleted.get(ClubMembership._meta.label, 0)
+            counters = {
+                'member_count': F('member_count') - changed,
+                'approved_member_count': F('approved_member_count') - was_approved,
+            }
+        Club.objects.filter(pk=club.pk).update(**counters)
+        objects.invalidate(Club, club.pk)
+
+        def after_commit():
+            for user_id in user_ids:
+                dashboard.invalidate(user_id)
+            page_cache.invalidate('clubs', f'club:{club.pk}')
+            if action != 'reject':
+                recommendations.refresh_club(club.pk)
+        transaction.on_commit(after_commit)
+    return changed
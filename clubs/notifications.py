@@ -0,0 +1,128 @@
+import datetime
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import dashboard
+from .cache import bump_version, get_versions
+from .models import ClubActivity, ClubMembership, FeedCursor
+from .pagination import keyset_page
+
+# Fan-out on read: an approval writes one ClubActivity row, and each user's
+# feed is the merge of the streams of the clubs they belong to (plus the
+# personal rows about them), read newest first by id. Nothing is copied per
+# member, so a club of 5,000 costs the same to notify as a club of 5.
+#
+# Reads stay bounded however many clubs a user is in: the feed only reaches
+# back WINDOW_DAYS, pages are keyset ranges on the id, and the unread count
+# stops at UNREAD_CAP.
+WINDOW_DAYS = getattr(settings, 'NOTIFICATION_WINDOW_DAYS', 90)
+UNREAD_CAP = getattr(settings, 'NOTIFICATION_UNREAD_CAP', 99)
+UNREAD_TIMEOUT = 60
+CLUBS_TIMEOUT = 60 * 60
+PAGE_SIZE = 20
+
+
+def club_version_name(club_id):
+    return f'activity:club:{club_id}'
+
+
+def user_version_name(user_id):
+    return f'activity:user:{user_id}'
+
+
+def _bump_on_commit(kind, club_id, subject_ids):
+    # Only the streams a new row shows up in: the club's for club-wide
+    # kinds, and the subject's own for rows about them
+    names = [user_version_name(subject_id) for subject_id in subject_ids if subject_id]
+    if kind not in ClubActivity.PERSONAL_KINDS:
+        names.append(club_version_name(club_id))
+
+    def bump():
+        for name in names:
+            bump_version(name)
+    transaction.on_commit(bump)
+
+
+def record(kind, club, actor=None, subject=None, event=None):
+    activity = ClubActivity.objects.create(kind=kind, club=club, actor=actor, subject=subject, event=event)
+    _bump_on_commit(kind, club.pk, [activity.subject_id])
+    return activity
+
+
+def record_many(kind, club, actor, subject_ids):
+    # One personal row per subject, e.g. a batch of approved memberships
+    ClubActivity.objects.bulk_create([
+        ClubActivity(kind=kind, club=club, actor=actor, subject_id=subject_id) for subject_id in subject_ids
+    ])
+    _bump_on_commit(kind, club.pk, subject_ids)
+
+
+def feed_for(user):
+    clubs = ClubMembership.objects.filter(user=user, status='approved').values('club_id')
+    since = timezone.now() - datetime.timedelta(days=WINDOW_DAYS)
+    return ClubActivity.objects.filter(
+        Q(club_id__in=clubs) & ~Q(kind__in=ClubActivity.PERSONAL_KINDS) | Q(subject=user),
+        created_at__gte=since,
+    )
+
+
+def feed_page(user, after=None, before=None, page_size=PAGE_SIZE):
+    return keyset_page(
+        feed_for(user).select_related('club', 'actor', 'subject', 'event'), ('-id',), page_size,
+        after=after, before=before,
+    )
+
+
+def last_read_id(user):
+    return FeedCursor.objects.filter(user=user).values_list('last_read_id', flat=True).first() or 0
+
+
+def _feed_club_ids(user):
+    # The clubs whose streams make up the feed, cached against the user's
+    # membership version
+    key = f'feed-clubs:{user.pk}:v{dashboard.membership_version(user.pk)}'
+    club_ids = cache.get(key)
+    if club_ids is None:
+        club_ids = sorted(ClubMembership.objects.filter(user=user, status='approved')
+                          .values_list('club_id', flat=True))
+        cache.set(key, club_ids, CLUBS_TIMEOUT)
+    return club_ids
+
+
+def _unread_key(user):
+    # Versioned on the user's own clubs, personal stream, cursor and
+    # memberships, so activity elsewhere leaves the cached count alone
+    names = [club_version_name(club_id) for club_id in _feed_club_ids(user)]
+    names += [user_version_name(user.pk), f'feed:{user.pk}', dashboard.version_name(user.pk)]
+    versions = get_versions(names)
+    digest = hashlib.md5('.'.join(str(versions[name]) for name in names).encode()).hexdigest()
+    return f'unread:{user.pk}:{digest}'
+
+
+def unread_count(user):
+    # Capped at UNREAD_CAP + 1 (shown as "99+"), one query on a cache miss
+    key = _unread_key(user)
+    count = cache.get(key)
+    if count is None:
+        cursor = FeedCursor.objects.filter(user=user).values('last_read_id')[:1]
+        unread = feed_for(user).filter(id__gt=Coalesce(Subquery(cursor), 0))
+        count = unread[:UNREAD_CAP + 1].count()
+        cache.set(key, count, UNREAD_TIMEOUT)
+    return count
+
+
+def mark_read(user, up_to=None):
+    if up_to is None:
+        up_to = ClubActivity.objects.aggregate(top=Max('id'))['top'] or 0
+    cursor, created = FeedCursor.objects.get_or_create(user=user, defaults={'last_read_id': up_to})
+    if not created and cursor.last_read_id < up_to:
+        FeedCursor.objects.filter(pk=cursor.pk, last_read_id__lt=up_to).update(
+            last_read_id=up_to, updated_at=timezone.now()
+        )
+    transaction.on_commit(lambda: bump_version(f'feed:{user.pk}'))
@@ -0,0 +1,92 @@
+import zlib
+from functools import lru_cache
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.http import Http404
+
+from .cache import bump_version, get_versions
+from .routing import use_primary
+
+# Read-through cache of single rows by primary key, for Club and Event
+# lookups at the top of views. Like clubs.auth, only raw field values are
+# cached and a fresh instance is built on every hit (through from_db, so the
+# models' loaded-state snapshots are set as usual). Each row has its own
+# generation counter, bumped by clubs.signals once a change is committed.
+TIMEOUT = getattr(settings, 'OBJECT_CACHE_TIMEOUT', 300)
+
+
+@lru_cache(maxsize=None)
+def _fields(model):
+    names = [field.attname for field in model._meta.concrete_fields]
+    # Part of the key, so entries from before a schema change are never read
+    return names, zlib.crc32(','.join(names).encode())
+
+
+def _name(model, pk):
+    return f'obj:{model._meta.label_lower}:{pk}'
+
+
+def invalidate(model, pk):
+    # After commit: bumping earlier would let a concurrent read cache the
+    # old row again under the new version
+    name = _name(model, pk)
+    transaction.on_commit(lambda: bump_version(name))
+
+
+def get_many(model, pks, related=()):
+    # {pk: instance} for the pks that exist; misses are fetched in one query.
+    # related names forward foreign keys to fill from this cache as well.
+    fields, schema = _fields(model)
+    pks = list(dict.fromkeys(pks))
+    names = {pk: _name(model, pk) for pk in pks}
+    versions = get_versions(names.values())
+    keys = {f'{names[pk]}:s{schema}:v{versions[names[pk]]}': pk for pk in pks}
+
+    objects = {
+        keys[key]: model.from_db(DEFAULT_DB_ALIAS, fields, values)
+        for key, values in cache.get_many(keys).items()
+    }
+    missing = [pk for pk in pks if pk not in objects]
+    if missing:
+        # Shared with every other request, so never filled from a replica
+        with use_primary():
+            fetched = model._default_manager.in_bulk(missing)
+        cache.set_many({
+            key: [getattr(fetched[pk], name) for name in fields]
+            for key, pk in keys.items() if pk in fetched
+        }, TIMEOUT)
+        objects.update(fetched)
+
+    for name in related:
+        field = model._meta.get_field(name)
+        targets = get_many(field.related_model, {
+            getattr(obj, field.attname) for obj in objects.values()
+        } - {None})
+        for obj in objects.values():
+            target = targets.get(getattr(obj, field.attname))
+            if target is not None:
+                obj._state.fields_cache[name] = target
+    return objects
+
+
+def get(model, pk, related=()):
+    try:
+        pk = model._meta.pk.to_python(pk)
+    except ValidationError:
+        return None
+    return get_many(model, [pk], related).get(pk)
+
+
+def get_cached_or_404(model, pk, related=()):
+    obj = get(model, pk, related)
+    if obj is None:
+        raise Http404(f'No {model._meta.object_name} matches the given query.')
+    return obj
+
+
+async def aget_cached_or_404(model, pk, related=()):
+    return await sync_to_async(get_cached_or_404)(model, pk, related)
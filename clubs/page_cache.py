@@ -0,0 +1,169 @@
+import asyncio
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from .cache import bump_version, get_version
+from .routing import use_primary
+
+# Whole-page cache for anonymous GETs of public pages. Each entry records the
+# generation counters it was rendered against (see clubs.cache); signals bump
+# those counters when clubs, events, memberships or registrations change.
+#
+# Entries are stored under the URL alone, not the version, so an outdated
+# page can still be served: the first request to notice it is stale takes a
+# short lock and re-renders, while concurrent requests keep getting the old
+# copy instead of all hitting the database at once.
+#
+# A page that goes into the cache is rendered from the primary even when the
+# view reads from a replica: it is stored against the primary's current
+# versions, so a lagging replica's content would pass as fresh.
+CACHE_ALIAS = getattr(settings, 'PAGE_CACHE_ALIAS', 'default')
+FRESH_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60)
+STALE_TIMEOUT = getattr(settings, 'PAGE_CACHE_STALE_TIMEOUT', 600)
+LOCK_TIMEOUT = 10
+# How long a request with nothing to serve waits on another one's render
+LOCK_WAIT = 2.0
+POLL_INTERVAL = 0.05
+
+CACHED_HEADERS = ('Content-Type', 'Content-Language')
+
+
+def invalidate(*names):
+    for name in names:
+        bump_version(f'pages:{name}')
+
+
+def _versions(names):
+    return tuple(get_version(f'pages:{name}') for name in names)
+
+
+def _cacheable_request(request):
+    if request.method not in ('GET', 'HEAD') or request.GET:
+        return False
+    if request.user.is_authenticated:
+        return False
+    # Pending flash messages are per visitor
+    return 'messages' not in request.COOKIES and '_messages' not in request.session
+
+
+def _cacheable_response(request, response):
+    # A page that issued a CSRF token or set cookies belongs to one visitor
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def _store(cache, key, versions, response):
+    headers = {name: response[name] for name in CACHED_HEADERS if name in response}
+    entry = (versions, time.time() + FRESH_TIMEOUT, response.content, headers)
+    cache.set(key, entry, FRESH_TIMEOUT + STALE_TIMEOUT)
+
+
+def _respond(entry, status):
+    _, _, content, headers = entry
+    response = HttpResponse(content, headers=headers)
+    response['X-Page-Cache'] = status
+    return response
+
+
+def _begin(request, names, kwargs):
+    # What to do for this request: ('bypass',), ('serve', response),
+    # ('wait', cache, key) when another request holds the render lock, or
+    # ('render', cache, key, lock_key, versions) with the lock taken
+    if not _cacheable_request(request):
+        return ('bypass',)
+
+    cache = caches[CACHE_ALIAS]
+    key = f'page:{request.path}'
+    lock_key = f'{key}:lock'
+    versions = _versions([name.format(**kwargs) for name in names])
+
+    entry = cache.get(key)
+    if entry is not None and entry[0] == versions and entry[1] > time.time():
+        return ('serve', _respond(entry, 'hit'))
+
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        if entry is not None:
+            return ('serve', _respond(entry, 'stale'))
+        return ('wait', cache, key)
+    return ('render', cache, key, lock_key, versions)
+
+
+def _render_on_primary(request):
+    # The page outlives the request (see above)
+    if getattr(request, 'read_database', None) is not None:
+        request.read_database = None
+    return use_primary()
+
+
+def _finish(request, response, plan):
+    _, cache, key, _, versions = plan
+    if hasattr(response, 'render') and callable(response.render):
+        response = response.render()
+    if _cacheable_response(request, response):
+        _store(cache, key, versions, response)
+    response['X-Page-Cache'] = 'miss'
+    return response
+
+
+def public_page_cache(*names):
+    # names are version names, formatted with the view's kwargs, e.g.
+    # @public_page_cache('clubs', 'club:{club_id}'). Works on sync and
+    # async views alike.
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                # Request user and session load lazily, so look up off the loop
+                plan = await sync_to_async(_begin)(request, names, kwargs)
+                if plan[0] == 'serve':
+                    return plan[1]
+                if plan[0] == 'wait':
+                    # Nothing to fall back on: give the lock holder a moment
+                    _, cache, key = plan
+                    deadline = time.monotonic() + LOCK_WAIT
+                    while time.monotonic() < deadline:
+                        await asyncio.sleep(POLL_INTERVAL)
+                        entry = await cache.aget(key)
+                        if entry is not None:
+                            return _respond(entry, 'hit')
+                if plan[0] != 'render':
+                    return await view(request, *args, **kwargs)
+                try:
+                    with _render_on_primary(request):
+                        response = await view(request, *args, **kwargs)
+                        return await sync_to_async(_finish)(request, response, plan)
+                finally:
+                    await plan[1].adelete(plan[3])
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            plan = _begin(request, names, kwargs)
+            if plan[0] == 'serve':
+                return plan[1]
+            if plan[0] == 'wait':
+                _, cache, key = plan
+                deadline = time.monotonic() + LOCK_WAIT
+                while time.monotonic() < deadline:
+                    time.sleep(POLL_INTERVAL)
+                    entry = cache.get(key)
+                    if entry is not None:
+                        return _respond(entry, 'hit')
+            if plan[0] != 'render':
+                return view(request, *args, **kwargs)
+            try:
+                with _render_on_primary(request):
+                    return _finish(request, view(request, *args, **kwargs), plan)
+            finally:
+                plan[1].delete(plan[3])
+        return wrapper
+    return decorator
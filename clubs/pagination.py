@@ -0,0 +1,102 @@
+import base64
+import json
+
+from django.db.models import Q
+
+# Keyset (cursor) pagination: pages are selected with a WHERE on the ordering
+# columns of the last/first row seen instead of OFFSET, so every page costs
+# the same index range scan however deep the user has scrolled. The ordering
+# must end in a unique column (id) so that the keys are total.
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != len(fields):
+        return None
+    try:
+        return [field.to_python(value) for field, value in zip(fields, values)]
+    except Exception:
+        return None
+
+
+def _keyset_filter(names, values, forward, descending):
+    # (a, b, id) > (x, y, z)  ==  a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)
+    # with < instead of > for descending columns (and all flipped going back)
+    condition = Q()
+    for i, name in enumerate(names):
+        lookup = 'gt' if forward != descending[i] else 'lt'
+        clause = Q(**{f'{name}__{lookup}': values[i]})
+        for prior, value in zip(names[:i], values[:i]):
+            clause &= Q(**{prior: value})
+        condition |= clause
+    return condition
+
+
+def _serialize(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+class KeysetPage:
+    def __init__(self, object_list, names, has_next, has_previous):
+        self.object_list = object_list
+        self.names = names
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def _cursor(self, obj):
+        return encode_cursor([_serialize(getattr(obj, name)) for name in self.names])
+
+    @property
+    def next_cursor(self):
+        return self._cursor(self.object_list[-1]) if self.has_next else None
+
+    @property
+    def previous_cursor(self):
+        return self._cursor(self.object_list[0]) if self.has_previous else None
+
+
+def keyset_page(queryset, ordering, page_size, after=None, before=None):
+    # ordering is field names ending in a unique column, e.g. ('date', 'id')
+    # or ('-id',) for newest first. Pass the cursor from next_cursor as
+    # `after` or from previous_cursor as `before`; an unreadable cursor
+    # restarts at page one.
+    model = queryset.model
+    descending = [name.startswith('-') for name in ordering]
+    fields = [model._meta.get_field(name.lstrip('-')) for name in ordering]
+    names = [field.attname for field in fields]
+
+    forward = True
+    values = decode_cursor(after, fields) if after else None
+    if values is None and before:
+        values = decode_cursor(before, fields)
+        forward = values is None
+
+    if values is not None:
+        queryset = queryset.filter(_keyset_filter(names, values, forward, descending))
+    order = [f'-{name}' if forward == desc else name for name, desc in zip(names, descending)]
+    rows = list(queryset.order_by(*order)[:page_size + 1])
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    if forward:
+        return KeysetPage(rows, names, has_next=more, has_previous=values is not None)
+    rows.reverse()
+    return KeysetPage(rows, names, has_next=True, has_previous=more)
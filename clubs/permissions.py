@@ -0,0 +1,65 @@
+from .models import ClubMembership
+
+# Per-request permission resolver. A user's memberships are loaded once as a
+# {club_id: (role, status)} map and memoised on the user object, which Django
+# builds afresh for every request, so any number of checks on a page cost a
+# single query.
+CACHE_ATTR = '_club_roles'
+
+
+def club_roles(user):
+    if not user.is_authenticated:
+        return {}
+    roles = getattr(user, CACHE_ATTR, None)
+    if roles is None:
+        roles = {
+            club_id: (role, status)
+            for club_id, role, status in ClubMembership.objects.filter(user=user).values_list('club_id', 'role', 'status')
+        }
+        setattr(user, CACHE_ATTR, roles)
+    return roles
+
+
+def invalidate(user):
+    if user is not None and CACHE_ATTR in getattr(user, '__dict__', {}):
+        delattr(user, CACHE_ATTR)
+
+
+def _club_id(club):
+    return getattr(club, 'pk', club)
+
+
+def has_role(user, club, role):
+    return club_roles(user).get(_club_id(club)) == (role, 'approved')
+
+
+def has_any_role(user, role):
+    return (role, 'approved') in club_roles(user).values()
+
+
+def _profile_role(user):
+    profile = getattr(user, 'userprofile', None)
+    return profile.role if profile else None
+
+
+def is_admin(user):
+    return user.is_authenticated and _profile_role(user) == 'admin'
+
+
+def is_faculty_advisor(user, club):
+    return has_role(user, club, 'faculty_advisor')
+
+
+def is_leader(user, club):
+    return has_role(user, club, 'leader')
+
+
+def can_manage_club(user, club):
+    if not user.is_authenticated:
+        return False
+    role = _profile_role(user)
+    if role == 'admin':
+        return True
+    if role == 'faculty' and is_faculty_advisor(user, club):
+        return True
+    return is_leader(user, club)
@@ -0,0 +1,148 @@
+import math
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+
+from .models import Club, ClubMembership, ClubSimilarity, UserProfile
+
+TOP_K = 20
+
+# A declared interest counts for less than actually being a member
+MEMBERSHIP_WEIGHT = 1.0
+INTEREST_WEIGHT = 0.5
+
+
+def _user_vectors(user_ids=None):
+    # Sparse user x club matrix as {user_id: {club_id: weight}}
+    vectors = defaultdict(dict)
+    memberships = ClubMembership.objects.filter(status='approved')
+    interests = UserProfile.interests.through.objects.all()
+    if user_ids is not None:
+        memberships = memberships.filter(user_id__in=user_ids)
+        interests = interests.filter(userprofile__user_id__in=user_ids)
+    for user_id, club_id in interests.values_list('userprofile__user_id', 'club_id').iterator():
+        vectors[user_id][club_id] = INTEREST_WEIGHT
+    for user_id, club_id in memberships.values_list('user_id', 'club_id').iterator():
+        vectors[user_id][club_id] = MEMBERSHIP_WEIGHT
+    return vectors
+
+
+def _cosine(cooccurrence, norms):
+    scores = defaultdict(dict)
+    for (a, b), value in cooccurrence.items():
+        score = value / math.sqrt(norms[a] * norms[b])
+        scores[a][b] = score
+        scores[b][a] = score
+    return scores
+
+
+def _top_k(neighbours, k):
+    return sorted(neighbours.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+def build_similarity(top_k=TOP_K):
+    # Club x club co-membership matrix, accumulated pair by pair from each
+    # user's (small) set of clubs, then normalised to cosine similarity.
+    cooccurrence = Counter()
+    norms = Counter()
+    for clubs in _user_vectors().values():
+        items = sorted(clubs.items())
+        for i, (a, wa) in enumerate(items):
+            norms[a] += wa * wa
+            for b, wb in items[i + 1:]:
+                cooccurrence[(a, b)] += wa * wb
+    scores = _cosine(cooccurrence, norms)
+    return {club_id: _top_k(neighbours, top_k) for club_id, neighbours in scores.items()}
+
+
+def rebuild(top_k=TOP_K, batch_size=1000):
+    neighbours = build_similarity(top_k)
+    rows = [
+        ClubSimilarity(club_id=club_id, neighbour_id=neighbour_id, score=score)
+        for club_id, ranked in neighbours.items()
+        for neighbour_id, score in ranked
+    ]
+    with transaction.atomic():
+        ClubSimilarity.objects.all().delete()
+        ClubSimilarity.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def refresh_club(club_id, top_k=TOP_K):
+    # Incremental update after a membership change: only users of this club
+    # can change its similarity to other clubs, so recompute its row from them
+    # and fold the new scores back into each neighbour's own top-K. The
+    # nightly rebuild corrects any drift this approximation leaves behind.
+    user_ids = set(ClubMembership.objects.filter(
+        club_id=club_id, status='approved'
+    ).values_list('user_id', flat=True))
+    user_ids.update(UserProfile.interests.through.objects.filter(
+        club_id=club_id
+    ).values_list('userprofile__user_id', flat=True))
+    vectors = _user_vectors(user_ids)
+
+    cooccurrence = Counter()
+    for clubs in vectors.values():
+        weight = clubs.get(club_id)
+        if weight is None:
+            continue
+        for other, other_weight in clubs.items():
+            if other != club_id:
+                cooccurrence[other] += weight * other_weight
+
+    norms = _club_norms(set(cooccurrence) | {club_id})
+    ranked = _top_k({
+        other: value / math.sqrt(norms[club_id] * norms[other])
+        for other, value in cooccurrence.items()
+        if norms[club_id] and norms[other]
+    }, top_k)
+
+    with transaction.atomic():
+        ClubSimilarity.objects.filter(club_id=club_id).delete()
+        ClubSimilarity.objects.filter(neighbour_id=club_id).delete()
+        ClubSimilarity.objects.bulk_create(
+            [ClubSimilarity(club_id=club_id, neighbour_id=other, score=score) for other, score in ranked] +
+            [ClubSimilarity(club_id=other, neighbour_id=club_id, score=score) for other, score in ranked]
+        )
+        for other, _ in ranked:
+            _trim(other, top_k)
+
+
+def _club_norms(club_ids):
+    # Squared L2 norm of each club's column: members weigh 1, users who only
+    # declared an interest weigh INTEREST_WEIGHT.
+    members = ClubMembership.objects.filter(club_id__in=club_ids, status='approved')
+    interests = UserProfile.interests.through.objects.filter(club_id__in=club_ids).exclude(
+        Exists(ClubMembership.objects.filter(
+            user_id=OuterRef('userprofile__user_id'),
+            club_id=OuterRef('club_id'),
+            status='approved',
+        ))
+    )
+    norms = Counter()
+    for club_id, count in members.values('club_id').annotate(n=Count('id')).values_list('club_id', 'n'):
+        norms[club_id] += count * MEMBERSHIP_WEIGHT ** 2
+    for club_id, count in interests.values('club_id').annotate(n=Count('id')).values_list('club_id', 'n'):
+        norms[club_id] += count * INTEREST_WEIGHT ** 2
+    return norms
+
+
+def _trim(club_id, top_k):
+    keep = ClubSimilarity.objects.filter(club_id=club_id).order_by('-score', 'neighbour_id').values_list('id', flat=True)[:top_k]
+    ClubSimilarity.objects.filter(club_id=club_id).exclude(id__in=list(keep)).delete()
+
+
+def recommend_clubs(user, limit=5):
+    # One query: sum neighbour scores over the user's clubs and interests,
+    # skipping clubs they already belong to.
+    source_clubs = ClubMembership.objects.filter(user=user, status='approved').values('club_id')
+    interest_clubs = UserProfile.interests.through.objects.filter(userprofile__user=user).values('club_id')
+    return Club.objects.filter(
+        Q(neighbour_of__club_id__in=source_clubs) |
+        Q(neighbour_of__club_id__in=interest_clubs)
+    ).exclude(
+        members=user
+    ).annotate(
+        score=Sum('neighbour_of__score')
+    ).order_by('-score', 'name')[:limit]
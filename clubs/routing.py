@@ -0,0 +1,122 @@
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Read replicas for read-only GET views. A view opts in with @replica_reads;
+# ReplicaMiddleware then picks a replica that is fresh enough for the whole
+# request and ReplicaRouter sends that request's reads to it. Writes always
+# go to the primary. Locally the replicas are SQLite copies refreshed by the
+# snapshot_replicas command.
+REPLICAS = getattr(settings, 'DATABASE_REPLICAS', [])
+# Seconds of primary writes a replica may be missing and still be used
+MAX_LAG = getattr(settings, 'DATABASE_REPLICA_MAX_LAG', 30)
+# After a write the client reads from the primary for this long, so it sees
+# its own change (a join, a registration) straight away
+PIN_SECONDS = getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 15)
+PIN_COOKIE = 'pin_primary'
+
+# Never served from a replica: a stale session would log people out
+PRIMARY_ONLY_APPS = {'sessions'}
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_reads(view):
+    view.replica_reads = True
+    return view
+
+
+def route_reads(alias):
+    # Until the enclosing use_database() block ends
+    _read_alias.set(alias)
+
+
+@contextmanager
+def use_database(alias):
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def use_primary():
+    # For work whose result outlives the request, e.g. filling a shared cache
+    return use_database(None)
+
+
+def on_primary(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_primary():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def snapshot_marker(alias):
+    return f"{connections.settings[alias]['NAME']}.synced"
+
+
+def _sqlite_last_write(path):
+    # Under WAL, commits land in the -wal file until the next checkpoint
+    times = [os.path.getmtime(name) for name in (path, f'{path}-wal') if os.path.exists(name)]
+    return max(times) if times else 0.0
+
+
+def replica_lag(alias):
+    # Seconds of primary writes the replica has not seen yet, None if it is
+    # unusable. Only file-backed SQLite copies can be measured here; a real
+    # replica's lag comes from the server (e.g. pg_last_xact_replay_timestamp)
+    # and is treated as zero.
+    replica = connections.settings[alias]
+    if replica['ENGINE'] != 'django.db.backends.sqlite3':
+        return 0.0
+    try:
+        with open(snapshot_marker(alias)) as handle:
+            synced_at = json.load(handle)['synced_at']
+    except (OSError, ValueError, KeyError):
+        return None
+    primary = connections.settings[DEFAULT_DB_ALIAS]
+    return max(0.0, _sqlite_last_write(primary['NAME']) - synced_at)
+
+
+def pick_replica():
+    fresh = [alias for alias in REPLICAS if (lag := replica_lag(alias)) is not None and lag <= MAX_LAG]
+    return random.choice(fresh) if fresh else None
+
+
+def pin_primary(response):
+    response.set_cookie(PIN_COOKIE, str(int(time.time()) + PIN_SECONDS), max_age=PIN_SECONDS, samesite='Lax')
+
+
+def is_pinned(request):
+    try:
+        return int(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are copies of the primary, never migrated on their own
+        return db not in REPLICAS
@@ -0,0 +1,205 @@
+import re
+
+from django.db import connection, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Club, Event
+
+# FTS5 shadow tables, keyed by the rowid of the source row
+CLUB_INDEX = 'clubs_club_fts'
+EVENT_INDEX = 'clubs_event_fts'
+
+INDEXES = {
+    CLUB_INDEX: ('name', 'description'),
+    EVENT_INDEX: ('title', 'description', 'location'),
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def is_enabled(using=None):
+    return (using or connection).vendor == 'sqlite'
+
+
+def build_match(query):
+    # Quote every token so user input can't inject FTS5 syntax, and make each
+    # one a prefix match so partially typed words still hit.
+    tokens = TOKEN_RE.findall(query or '')
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def create_indexes(conn):
+    with conn.cursor() as cursor:
+        for table, columns in INDEXES.items():
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5({', '.join(columns)}, "
+                f"tokenize='unicode61 remove_diacritics 2')"
+            )
+
+
+def drop_indexes(conn):
+    with conn.cursor() as cursor:
+        for table in INDEXES:
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+def _write(table, pk, values):
+    columns = INDEXES[table]
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [pk])
+        cursor.execute(
+            f"INSERT INTO {table} (rowid, {', '.join(columns)}) VALUES (%s, {', '.join(['%s'] * len(columns))})",
+            [pk, *values],
+        )
+
+
+def _delete(table, pk):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [pk])
+
+
+def index_club(club):
+    if is_enabled():
+        _write(CLUB_INDEX, club.pk, [club.name, club.description])
+
+
+def remove_club(club_id):
+    if is_enabled():
+        _delete(CLUB_INDEX, club_id)
+
+
+def index_event(event):
+    if is_enabled():
+        _write(EVENT_INDEX, event.pk, [event.title, event.description, event.location])
+
+
+def remove_event(event_id):
+    if is_enabled():
+        _delete(EVENT_INDEX, event_id)
+
+
+def rebuild(conn=None, batch_size=2000):
+    conn = conn or connection
+    drop_indexes(conn)
+    create_indexes(conn)
+    sources = [
+        (CLUB_INDEX, Club.objects.using(conn.alias).values_list('id', 'name', 'description')),
+        (EVENT_INDEX, Event.objects.using(conn.alias).values_list('id', 'title', 'description', 'location')),
+    ]
+    with conn.cursor() as cursor:
+        for table, rows in sources:
+            columns = INDEXES[table]
+            sql = (
+                f"INSERT INTO {table} (rowid, {', '.join(columns)}) "
+                f"VALUES (%s, {', '.join(['%s'] * len(columns))})"
+            )
+            batch = []
+            for row in rows.iterator(chunk_size=batch_size):
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    cursor.executemany(sql, batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+
+
+# Lazy, ranked result set over an FTS5 index. Supports count() and slicing so
+# it can be handed straight to Paginator; only the requested page of ids is
+# ranked out of the index and loaded from the model table.
+class SearchResults:
+    def __init__(self, queryset, table, match, join='', where='', params=None):
+        self.queryset = queryset
+        self.table = table
+        self.match = match
+        self.join = join
+        self.where = where
+        self.params = params or []
+        self._count = None
+
+    def _database(self):
+        # The index is read on the same database the rows are loaded from,
+        # so a replica that hasn't caught up can't drop matching rows
+        return self.queryset.db
+
+    def _from(self):
+        sql = f'FROM {self.table} f {self.join} WHERE {self.table} MATCH %s {self.where}'
+        return sql, [self.match, *self.params]
+
+    def count(self):
+        if self._count is None:
+            if not self.match:
+                self._count = 0
+            else:
+                sql, params = self._from()
+                with connections[self._database()].cursor() as cursor:
+                    cursor.execute(f'SELECT COUNT(*) {sql}', params)
+                    self._count = cursor.fetchone()[0]
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self[key:key + 1][0]
+        if not self.match:
+            return []
+        start = key.start or 0
+        limit = -1 if key.stop is None else max(key.stop - start, 0)
+        sql, params = self._from()
+        alias = self._database()
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                f'SELECT f.rowid {sql} ORDER BY bm25({self.table}) LIMIT %s OFFSET %s',
+                [*params, limit, start],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        objects = self.queryset.using(alias).in_bulk(ids)
+        return [objects[pk] for pk in ids if pk in objects]
+
+
+# Used on databases without FTS5: plain icontains scans, same interface.
+class FallbackResults:
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def count(self):
+        return self.queryset.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        return list(self.queryset[key]) if isinstance(key, slice) else self.queryset[key]
+
+
+# Both accept a base queryset (annotations, select_related) that the matching
+# rows are loaded through.
+def search_clubs(query, queryset=None):
+    queryset = Club.objects.all() if queryset is None else queryset
+    if not is_enabled():
+        return FallbackResults(queryset.filter(
+            Q(name__icontains=query) |
+            Q(description__icontains=query)
+        ).order_by('name'))
+    return SearchResults(queryset, CLUB_INDEX, build_match(query))
+
+
+def search_events(query, upcoming=True, queryset=None):
+    queryset = Event.objects.select_related('club') if queryset is None else queryset
+    if not is_enabled():
+        events = queryset.filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(location__icontains=query)
+        )
+        if upcoming:
+            events = events.filter(date__gte=timezone.now())
+        return FallbackResults(events.order_by('date'))
+    join, where, params = '', '', []
+    if upcoming:
+        join = f'INNER JOIN {Event._meta.db_table} e ON e.id = f.rowid'
+        where = 'AND e.date >= %s'
+        params = [connection.ops.adapt_datetimefield_value(timezone.now())]
+    return SearchResults(queryset, EVENT_INDEX, build_match(query), join, where, params)
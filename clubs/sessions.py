@@ -0,0 +1,197 @@
+import atexit
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils import timezone
+
+from .db import retry_on_locked
+
+logger = logging.getLogger(__name__)
+
+# Session engine (SESSION_ENGINE = 'clubs.sessions'). Sessions are read from
+# and written to the cache; the database copy is only there so sessions
+# survive a restart or a cache eviction. Changed sessions are queued and a
+# background thread writes them out in one batch every WRITE_BEHIND_INTERVAL
+# seconds, so a request never waits on the session table. A session that
+# comes back unchanged isn't written anywhere.
+#
+# Only cosmetic changes are deferred. A change to who is logged in (login,
+# logout, a password change rehashing the session) is written to the
+# database straight away, and deletes always are, so a worker that misses
+# its cache still sees it. A queued write is lost if the process dies
+# before the next flush; at worst that is a flash message or a preference.
+#
+# With more than one worker the 'sessions' cache must be shared (see
+# SESSION_REDIS_URL in settings): a worker reading its own stale copy would
+# still see a session another worker has logged out.
+WRITE_BEHIND_INTERVAL = getattr(settings, 'SESSION_WRITE_BEHIND_INTERVAL', 2.0)
+PURGE_BATCH_SIZE = 1000
+
+# One letter instead of the role name, see set_role()
+ROLE_KEY = '_r'
+ROLE_CODES = {'student': 's', 'faculty': 'f', 'admin': 'a'}
+
+# Changes to these are written through, never queued
+AUTH_KEYS = (SESSION_KEY, BACKEND_SESSION_KEY, HASH_SESSION_KEY)
+
+_pending = {}  # session_key -> (session_data, expire_date)
+_lock = threading.Lock()
+# Held while a batch is written, so a delete can't be undone by a flush
+_flush_lock = threading.Lock()
+_wakeup = threading.Event()
+_writer = None
+
+
+def set_role(session, role):
+    # Stands in for the session['role'] register() used to write. Nothing in
+    # the app reads it back: the role comes from the profile that the auth
+    # backend loads with the user.
+    session[ROLE_KEY] = ROLE_CODES.get(role, role)
+
+
+def _queue(session_key, session_data, expire_date):
+    global _writer
+    with _lock:
+        _pending[session_key] = (session_data, expire_date)
+        # Started lazily, so every (forked) worker gets its own
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(target=_run_writer, name='session-write-behind', daemon=True)
+            _writer.start()
+
+
+def _queued(session_key):
+    with _lock:
+        return _pending.get(session_key)
+
+
+@retry_on_locked
+def _write(model, batch):
+    model.objects.bulk_create(
+        [model(session_key=key, session_data=data, expire_date=expires)
+         for key, (data, expires) in batch.items()],
+        update_conflicts=True,
+        unique_fields=['session_key'],
+        update_fields=['session_data', 'expire_date'],
+    )
+
+
+def flush_pending():
+    with _flush_lock:
+        with _lock:
+            batch = dict(_pending)
+            _pending.clear()
+        if not batch:
+            return 0
+        try:
+            _write(SessionStore.get_model_class(), batch)
+        except Exception:
+            logger.exception('Could not write %d sessions, will retry', len(batch))
+            with _lock:
+                # Keep whatever was queued for the same sessions meanwhile
+                for key, value in batch.items():
+                    _pending.setdefault(key, value)
+            return 0
+        return len(batch)
+
+
+def _run_writer():
+    from django.db import connection
+    while True:
+        _wakeup.wait(WRITE_BEHIND_INTERVAL)
+        _wakeup.clear()
+        flush_pending()
+        connection.close_if_unusable_or_obsolete()
+
+
+atexit.register(flush_pending)
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = 'clubs.sessions'
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._stored = None
+        self._stored_auth = self._auth(None)
+
+    def _serialized(self, data):
+        return self.serializer().dumps(data)
+
+    @staticmethod
+    def _auth(data):
+        return tuple((data or {}).get(key) for key in AUTH_KEYS)
+
+    def load(self):
+        queued = _queued(self.session_key) if self.session_key else None
+        if queued is not None and queued[1] > timezone.now():
+            data = self.decode(queued[0])
+        else:
+            data = super().load()
+        # What's stored now; save() compares against it. Serialized, so
+        # changes made in place to nested values are noticed as well.
+        self._stored = self._serialized(data)
+        self._stored_auth = self._auth(data)
+        return data
+
+    async def aload(self):
+        # The inherited async path would skip the bookkeeping above
+        return await sync_to_async(self.load)()
+
+    def exists(self, session_key):
+        return bool(session_key) and _queued(session_key) is not None or super().exists(session_key)
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        if must_create:
+            # A new key has to be claimed in the database straight away
+            super().save(must_create=True)
+            data = self._get_session(no_load=True)
+            self._stored, self._stored_auth = self._serialized(data), self._auth(data)
+            return
+        data = self._get_session()
+        serialized = self._serialized(data)
+        if serialized == self._stored:
+            return
+        if self._auth(data) != self._stored_auth:
+            # Written through, after dropping any older queued copy that a
+            # later flush would otherwise put back over it
+            with _flush_lock:
+                with _lock:
+                    _pending.pop(self.session_key, None)
+                super().save()
+        else:
+            self._cache.set(self.cache_key, data, self.get_expiry_age())
+            _queue(self.session_key, self.encode(data), self.get_expiry_date())
+        self._stored, self._stored_auth = serialized, self._auth(data)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            session_key = self.session_key
+        if session_key is None:
+            return
+        with _flush_lock:
+            with _lock:
+                _pending.pop(session_key, None)
+            super().delete(session_key)
+
+    @classmethod
+    def clear_expired(cls, batch_size=PURGE_BATCH_SIZE, pause=0.0):
+        # Small DELETEs by primary key, each its own transaction, instead of
+        # one statement that holds the write lock for the whole table
+        model = cls.get_model_class()
+        total = 0
+        while True:
+            keys = list(model.objects.filter(expire_date__lt=timezone.now())
+                        .values_list('session_key', flat=True)[:batch_size])
+            if not keys:
+                return total
+            model.objects.filter(session_key__in=keys).delete()
+            total += len(keys)
+            if pause:
+                time.sleep(pause)
@@ -1,16 +1,201 @@
-from django.db.models.signals import post_save
+import threading
+from contextlib import contextmanager
+
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from django.contrib.auth.signals import user_logged_in
+from .models import UserProfile, Club, Event, ClubMembership, EventRegistration
+from . import search, calendar_data, permissions, dashboard, page_cache, objects
+from .auth import evict_principal
+from .sessions import set_role
+
+# Bulk paths (imports, fixtures) can switch off per-user profile syncing
+_sync = threading.local()
+
+@contextmanager
+def suppress_profile_sync():
+    previous = getattr(_sync, 'suppressed', False)
+    _sync.suppressed = True
+    try:
+        yield
+    finally:
+        _sync.suppressed = previous
+
+def profile_sync_suppressed():
+    return getattr(_sync, 'suppressed', False)
+
+# clubs.moderation applies membership side effects once per batch itself
+@contextmanager
+def suppress_membership_signals():
+    previous = getattr(_sync, 'memberships', False)
+    _sync.memberships = True
+    try:
+        yield
+    finally:
+        _sync.memberships = previous
+
+def _membership_signals_suppressed(sender):
+    return sender is ClubMembership and getattr(_sync, 'memberships', False)
 
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not profile_sync_suppressed():
         UserProfile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+def save_user_profile(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    # Partial saves such as login's update_fields=['last_login'] can't have
+    # touched the profile, and a profile that was never loaded can't be dirty.
+    if created or raw or update_fields is not None or profile_sync_suppressed():
+        return
+    # Users left without a profile (fixtures, accounts older than the
+    # create signal) are repaired once by migration 0009, not on every save.
+    profile = instance._state.fields_cache.get('userprofile')
+    if profile is not None and profile.is_dirty():
+        profile.save()
+
+# Cached principals in clubs.auth go stale as soon as the user or profile row changes
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def evict_user_principal(sender, instance, **kwargs):
+    evict_principal(instance.pk)
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def evict_profile_principal(sender, instance, **kwargs):
+    evict_principal(instance.user_id)
+
+@receiver(user_logged_in)
+def remember_role(sender, request, user, **kwargs):
     try:
-        instance.userprofile.save()
+        set_role(request.session, user.userprofile.role)
     except UserProfile.DoesNotExist:
-        UserProfile.objects.create(user=instance)
+        pass
+
+# Cached Club/Event rows (clubs.objects); counter updates above invalidate
+# their row themselves, since update() sends no signals
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_cached_object(sender, instance, **kwargs):
+    objects.invalidate(sender, instance.pk)
+
+# Keep the full-text search index in sync with clubs and events
+@receiver(post_save, sender=Club)
+def index_club(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_club(instance)
+
+@receiver(post_delete, sender=Club)
+def unindex_club(sender, instance, **kwargs):
+    search.remove_club(instance.pk)
+
+@receiver(post_save, sender=Event)
+def index_event(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_event(instance)
+
+@receiver(post_delete, sender=Event)
+def unindex_event(sender, instance, **kwargs):
+    search.remove_event(instance.pk)
+
+# Cached calendar months are versioned per month; bump the month(s) touched
+@receiver(post_save, sender=Event)
+def invalidate_event_month(sender, instance, **kwargs):
+    calendar_data.invalidate_month(instance.date)
+    loaded_date = getattr(instance, '_loaded_date', None)
+    if loaded_date and loaded_date != instance.date:
+        calendar_data.invalidate_month(loaded_date)
+    instance._loaded_date = instance.date
+
+@receiver(post_delete, sender=Event)
+def invalidate_deleted_event_month(sender, instance, **kwargs):
+    calendar_data.invalidate_month(instance.date)
+
+# Denormalised member/registration counters. Each change is a single
+# UPDATE ... SET col = col + n, so concurrent writers never lose increments.
+def _bump_club(club_id, members=0, approved=0):
+    changes = {}
+    if members:
+        changes['member_count'] = F('member_count') + members
+    if approved:
+        changes['approved_member_count'] = F('approved_member_count') + approved
+    if changes:
+        Club.objects.filter(pk=club_id).update(**changes)
+        objects.invalidate(Club, club_id)
+
+@receiver(post_save, sender=ClubMembership)
+def count_membership(sender, instance, created, raw=False, **kwargs):
+    if raw or _membership_signals_suppressed(sender):
+        return
+    is_approved = instance.status == 'approved'
+    if created:
+        _bump_club(instance.club_id, members=1, approved=int(is_approved))
+    else:
+        was_approved = getattr(instance, '_loaded_status', None) == 'approved'
+        _bump_club(instance.club_id, approved=int(is_approved) - int(was_approved))
+    instance._loaded_status = instance.status
+
+@receiver(post_delete, sender=ClubMembership)
+def uncount_membership(sender, instance, **kwargs):
+    if _membership_signals_suppressed(sender):
+        return
+    _bump_club(instance.club_id, members=-1, approved=-int(instance.status == 'approved'))
+
+@receiver(post_save, sender=EventRegistration)
+def count_registration(sender, instance, created, raw=False, **kwargs):
+    # Event.register() claims its seat up front; don't count it twice
+    if raw:
+        return
+    if created and not getattr(instance, '_seat_reserved', False):
+        Event.objects.filter(pk=instance.event_id).update(registration_count=F('registration_count') + 1)
+    objects.invalidate(Event, instance.event_id)
+
+@receiver(post_delete, sender=EventRegistration)
+def uncount_registration(sender, instance, **kwargs):
+    Event.objects.filter(pk=instance.event_id).update(registration_count=F('registration_count') - 1)
+    objects.invalidate(Event, instance.event_id)
+
+# Drop a memoised role map when one of that user's memberships changes
+@receiver(post_save, sender=ClubMembership)
+@receiver(post_delete, sender=ClubMembership)
+def invalidate_club_roles(sender, instance, **kwargs):
+    if _membership_signals_suppressed(sender):
+        return
+    permissions.invalidate(instance._state.fields_cache.get('user'))
+
+# Cached dashboard panels are keyed by the user's membership version
+@receiver(post_save, sender=ClubMembership)
+@receiver(post_delete, sender=ClubMembership)
+@receiver(post_save, sender=EventRegistration)
+@receiver(post_delete, sender=EventRegistration)
+def invalidate_dashboard(sender, instance, raw=False, **kwargs):
+    if not raw and not _membership_signals_suppressed(sender):
+        dashboard.invalidate(instance.user_id)
+
+# Anonymous page cache generations (clubs.page_cache)
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+def invalidate_club_pages(sender, instance, **kwargs):
+    page_cache.invalidate('clubs', f'club:{instance.pk}')
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_pages(sender, instance, **kwargs):
+    page_cache.invalidate('events', f'event:{instance.pk}', f'club:{instance.club_id}')
+
+@receiver(post_save, sender=ClubMembership)
+@receiver(post_delete, sender=ClubMembership)
+def invalidate_membership_pages(sender, instance, **kwargs):
+    # Home ranks clubs by member count; the club page lists members
+    if _membership_signals_suppressed(sender):
+        return
+    page_cache.invalidate('clubs', f'club:{instance.club_id}')
+
+@receiver(post_save, sender=EventRegistration)
+@receiver(post_delete, sender=EventRegistration)
+def invalidate_registration_pages(sender, instance, **kwargs):
+    page_cache.invalidate(f'event:{instance.event_id}')
@@ -0,0 +1,21 @@
+from django import template
+from clubs import permissions
+
+register = template.Library()
+
+@register.filter
+def can_manage(user, club):
+    return permissions.can_manage_club(user, club)
+
+@register.filter
+def advises(user, club):
+    return permissions.is_faculty_advisor(user, club)
+
+@register.filter
+def leads(user, club):
+    return permissions.is_leader(user, club)
+
+@register.filter
+def club_role(user, club):
+    role = permissions.club_roles(user).get(getattr(club, 'pk', club))
+    return role[0] if role else ''
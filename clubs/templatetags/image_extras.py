@@ -0,0 +1,30 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+from clubs import images
+
+register = template.Library()
+
+def _srcset(name, fmt, widths):
+    return ', '.join(
+        f'{default_storage.url(images.variant_name(name, width, fmt))} {width}w' for width in widths
+    )
+
+@register.simple_tag
+def responsive_image(image, fallback=None, alt='', css_class='', sizes='100vw', style=''):
+    # <picture> with AVIF/WebP srcsets for whichever variants the image
+    # pipeline has produced so far, falling back to the thumbnail (or the
+    # original upload) while they are still being generated.
+    src = fallback or image
+    if not src:
+        return ''
+    sources = []
+    if image:
+        for fmt, widths in images.available_variants(image.name).items():
+            if widths:
+                sources.append((fmt, _srcset(image.name, fmt, widths), sizes))
+    return format_html(
+        '<picture>{}<img src="{}" alt="{}" class="{}" style="{}" loading="lazy"></picture>',
+        format_html_join('', '<source type="image/{}" srcset="{}" sizes="{}">', sources),
+        src.url, alt, css_class, style,
+    )
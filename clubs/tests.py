@@ -0,0 +1,132 @@
+import datetime
+import threading
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from .management.commands.index_advisor import problems, sqlite_plan, workload
+from .models import Club, ClubMembership, Event, EventRegistration, EventWaitlist
+
+
+class EventRegistrationTests(TransactionTestCase):
+    def make_event(self, capacity):
+        club = Club.objects.create(name='Chess', description='Chess club')
+        return Event.objects.create(
+            title='Simul',
+            description='Simultaneous exhibition',
+            date=timezone.now() + datetime.timedelta(days=1),
+            location='Hall',
+            club=club,
+            capacity=capacity,
+            status='approved',
+        )
+
+    def test_concurrent_registrations_never_exceed_capacity(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Threads cannot share an in-memory SQLite database')
+        event = self.make_event(capacity=5)
+        users = User.objects.bulk_create([User(username=f'user{i}') for i in range(40)])
+        # Every user tries twice so duplicates race with the last seats too
+        attempts = [user for user in users for _ in range(2)]
+        results = Counter()
+        errors = []
+        lock = threading.Lock()
+
+        def worker(chunk):
+            try:
+                target = Event.objects.get(pk=event.pk)
+                for user in chunk:
+                    result = target.register(user)
+                    with lock:
+                        results[result] += 1
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(attempts[i::8],)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        event.refresh_from_db()
+        self.assertEqual(EventRegistration.objects.filter(event=event).count(), event.capacity)
+        self.assertEqual(event.registration_count, event.capacity)
+        self.assertEqual(results['registered'], event.capacity)
+        self.assertEqual(results['full'] + results['duplicate'], len(attempts) - event.capacity)
+
+    def test_registered_user_on_full_event_is_a_duplicate(self):
+        event = self.make_event(capacity=1)
+        holder = User.objects.create(username='holder')
+        other = User.objects.create(username='other')
+
+        self.assertEqual(event.register(holder), 'registered')
+        self.assertEqual(event.register(holder), 'duplicate')
+        self.assertIsNone(event.join_waitlist(holder))
+        self.assertEqual(event.register(other), 'full')
+        self.assertEqual(event.join_waitlist(other), 1)
+
+        # The freed seat goes to the queue, not back to the holder
+        event.cancel_registration(holder)
+        event.refresh_from_db()
+        self.assertEqual(list(event.registered_users.all()), [other])
+        self.assertEqual(event.registration_count, 1)
+        self.assertFalse(EventWaitlist.objects.filter(event=event).exists())
+
+
+class IndexPlanTests(TestCase):
+    # Workload querysets from the index_advisor command and the index from
+    # migration 0007 each one is expected to use
+    EXPECTED_INDEXES = {
+        'home: top clubs': (Club, ['-member_count']),
+        'club_list page': (Club, ['name']),
+        'club_list by category': (Club, ['category', 'name']),
+        'approved upcoming events': (Event, ['status', 'date']),
+        'club_detail events': (Event, ['club', 'date']),
+        'club_manage events': (Event, ['club', 'date']),
+        'club_manage pending': (ClubMembership, ['club', 'status']),
+        'club_manage members': (ClubMembership, ['club', 'status']),
+        'club leaders': (ClubMembership, ['club', 'status']),
+        'get_led_clubs': (ClubMembership, ['user', 'role', 'status', 'club']),
+        'get_advised_clubs': (ClubMembership, ['user', 'role', 'status', 'club']),
+        'permissions.club_roles': (ClubMembership, ['user', 'role', 'status', 'club']),
+    }
+    # Per-user sorts after a join and the GROUP BY in recommend_clubs; no
+    # single index removes their temporary B-tree
+    KNOWN_SORTS = {
+        'dashboard: my events',
+        'get_recommended_events',
+        'get_recommended_events fallback',
+        'get_recommended_clubs',
+    }
+
+    def setUp(self):
+        self.user = User.objects.create(username='student')
+        self.club = Club.objects.create(name='Chess', description='Chess club')
+        ClubMembership.objects.create(user=self.user, club=self.club, status='approved')
+        self.event = Event.objects.create(
+            title='Simul', description='Simultaneous exhibition', location='Hall', club=self.club,
+            date=timezone.now() + datetime.timedelta(days=1),
+        )
+
+    def plans(self):
+        return {name: sqlite_plan(queryset) for name, queryset in workload(self.user, self.club, self.event)}
+
+    def test_workload_uses_the_new_indexes(self):
+        plans = self.plans()
+        for name, (model, fields) in self.EXPECTED_INDEXES.items():
+            index = next(index.name for index in model._meta.indexes if index.fields == fields)
+            with self.subTest(name):
+                self.assertTrue(any(index in step for step in plans[name]), plans[name])
+
+    def test_workload_has_no_scans_or_temp_sorts(self):
+        for name, plan in self.plans().items():
+            if name in self.KNOWN_SORTS:
+                continue
+            with self.subTest(name):
+                self.assertEqual(problems(plan), [], plan)
@@ -1,6 +1,6 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path('', views.home, name='home'),
@@ -9,6 +9,7 @@ urlpatterns = [
     path('events/', views.event_list, name='event_list'),
     path('events/<int:event_id>/', views.event_detail, name='event_detail'),
     path('clubs/<int:club_id>/members/', views.member_list, name='member_list'),
+    path('search/', views.search_view, name='search'),
     
     # Authentication URLs
     path('login/', auth_views.LoginView.as_view(
@@ -20,24 +21,48 @@ urlpatterns = [
     path('profile/', views.profile_view, name='profile'),
     path('profile/<str:username>/', views.public_profile_view, name='public_profile'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('notifications/', views.notification_feed, name='notifications'),
+    path('notifications/unread.json', views.notification_unread_count, name='notifications_unread'),
     
     # Club and Event Registration
     # Club Management URLs
     path('clubs/<int:club_id>/manage/', views.club_manage, name='club_manage'),
     path('clubs/<int:club_id>/join/', views.join_club, name='join_club'),
     path('clubs/<int:club_id>/leave/', views.leave_club, name='leave_club'),
+    path('clubs/<int:club_id>/members/export.<str:fmt>', views.export_club_members, name='export_club_members'),
+    path('clubs/<int:club_id>/members/bulk/', views.bulk_moderate_members, name='bulk_moderate_members'),
     path('clubs/<int:club_id>/members/<int:membership_id>/approve/', views.approve_member, name='approve_member'),
     path('clubs/<int:club_id>/members/<int:membership_id>/reject/', views.reject_member, name='reject_member'),
     path('clubs/<int:club_id>/members/<int:membership_id>/remove/', views.remove_member, name='remove_member'),
     path('clubs/<int:club_id>/members/<int:membership_id>/make-leader/', views.make_leader, name='make_leader'),
+    path('clubs/<int:club_id>/assign-leader/', views.assign_leader, name='assign_leader'),
     path('clubs/<int:club_id>/update/', views.update_club, name='update_club'),
     path('clubs/<int:club_id>/delete/', views.delete_club, name='delete_club'),
     path('clubs/<int:club_id>/events/create/', views.create_event, name='create_event'),
     
     # Event Management URLs
+    path('events/<int:event_id>/registrations/export.<str:fmt>', views.export_event_registrations, name='export_event_registrations'),
     path('events/<int:event_id>/register/', views.register_event, name='register_event'),
     path('events/<int:event_id>/cancel/', views.cancel_event_registration, name='cancel_event_registration'),
     path('events/<int:event_id>/approve/', views.approve_event, name='approve_event'),
     path('events/<int:event_id>/reject/', views.reject_event, name='reject_event'),
     path('calendar/', views.calendar_view, name='calendar'),
+    path('calendar/<int:year>/<int:month>.json', views.calendar_month_json, name='calendar_month_json'),
+]
+
+# The same routes with the read-only pages served by clubs.async_views,
+# mounted by collegehub.asgi_urls when running under ASGI
+ASYNC_VIEWS = {
+    'home': async_views.home,
+    'club_list': async_views.club_list,
+    'club_detail': async_views.club_detail,
+    'event_list': async_views.event_list,
+    'event_detail': async_views.event_detail,
+    'calendar': async_views.calendar_view,
+    'export_event_registrations': async_views.export_event_registrations,
+    'export_club_members': async_views.export_club_members,
+}
+async_urlpatterns = [
+    path(str(route.pattern), ASYNC_VIEWS[route.name], name=route.name) if route.name in ASYNC_VIEWS else route
+    for route in urlpatterns
 ]
@@ -3,64 +3,97 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login, authenticate
 from django.contrib import messages
 from django.utils import timezone
-from django.db.models import Q, Count
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse, Http404
+from django.core.paginator import Paginator
+from django.db.models import Exists, OuterRef, Value
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from .models import Club, Event, UserProfile, ClubMembership, EventRegistration
+from .models import Club, Event, UserProfile, ClubMembership, EventRegistration, EventWaitlist
 from .forms import (
     CustomUserCreationForm, UserProfileForm, EventRegistrationForm,
     ClubMembershipForm, EventCreateForm, ClubUpdateForm, LeaderAssignmentForm
 )
+from . import search, recommendations, calendar_data, images
+from . import dashboard as dashboard_panels
+from . import moderation, exports, notifications
+from .pagination import keyset_page
+from .page_cache import public_page_cache
+from .db import retry_on_locked
+from .routing import replica_reads
+from .objects import get_cached_or_404
+from .signals import suppress_profile_sync
 from calendar import monthrange
 
 User = get_user_model()
 
+SEARCH_PAGE_SIZE = 12
+LIST_PAGE_SIZE = 12
+
+def clubs_for(user):
+    # One EXISTS per row instead of loading every member to test `user in`
+    if not user.is_authenticated:
+        return Club.objects.annotate(is_member=Value(False))
+    return Club.objects.annotate(is_member=Exists(
+        ClubMembership.objects.filter(club=OuterRef('pk'), user=user)
+    ))
+
+def events_for(user):
+    events = Event.objects.select_related('club')
+    if not user.is_authenticated:
+        return events.annotate(is_registered=Value(False))
+    return events.annotate(is_registered=Exists(
+        EventRegistration.objects.filter(event=OuterRef('pk'), user=user)
+    ))
+
+@replica_reads
+@public_page_cache('clubs', 'events')
 def home(request):
     query = request.GET.get('q')
-    clubs = Club.objects.annotate(member_count=Count('members')).order_by('-member_count')[:3]
+    clubs = Club.objects.order_by('-member_count')[:3]
     upcoming_events = Event.objects.filter(
         date__gte=timezone.now()
     ).order_by('date')[:5]
 
-    recommended_clubs = []
-    recommended_events = []
-    if request.user.is_authenticated:
-        recommended_clubs = Club.get_recommended_clubs(request.user)
-        recommended_events = Event.get_recommended_events(request.user)
-    
     if query:
-        clubs = Club.objects.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query)
-        )
-        upcoming_events = Event.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(location__icontains=query)
-        ).filter(date__gte=timezone.now()).order_by('date')
+        # Top-ranked hits only; the full result set lives on the search page
+        clubs = search.search_clubs(query)[:SEARCH_PAGE_SIZE]
+        upcoming_events = search.search_events(query)[:SEARCH_PAGE_SIZE]
     
     context = {
         'clubs': clubs,
         'upcoming_events': upcoming_events,
-        'recommended_clubs': recommended_clubs,
-        'recommended_events': recommended_events,
     }
     return render(request, 'index.html', context)
 
+@replica_reads
 def club_list(request):
     query = request.GET.get('q')
     if query:
-        clubs = Club.objects.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query)
-        )
+        results = search.search_clubs(query, queryset=clubs_for(request.user))
+        clubs = Paginator(results, SEARCH_PAGE_SIZE).get_page(request.GET.get('page'))
     else:
-        clubs = Club.objects.all()
-    return render(request, 'clubs/club_list.html', {'clubs': clubs})
+        clubs = keyset_page(
+            clubs_for(request.user), ('name', 'id'), LIST_PAGE_SIZE,
+            after=request.GET.get('after'), before=request.GET.get('before'),
+        )
+    return render(request, 'clubs/club_list.html', {'clubs': clubs, 'query': query})
+
+def search_view(request):
+    query = request.GET.get('q', '').strip()
+    page = request.GET.get('page')
+    clubs = Paginator(search.search_clubs(query, queryset=clubs_for(request.user)), SEARCH_PAGE_SIZE).get_page(page)
+    events = Paginator(search.search_events(query, queryset=events_for(request.user)), SEARCH_PAGE_SIZE).get_page(page)
+    return render(request, 'clubs/search_results.html', {
+        'query': query,
+        'clubs': clubs,
+        'events': events,
+        # Drive the pager from whichever result list runs longer
+        'page': clubs if clubs.paginator.num_pages >= events.paginator.num_pages else events,
+    })
 
+@public_page_cache('club:{club_id}')
 def club_detail(request, club_id):
-    club = get_object_or_404(Club, id=club_id)
+    club = get_cached_or_404(Club, club_id)
     membership = None
     if request.user.is_authenticated:
         membership = ClubMembership.objects.filter(
@@ -74,24 +107,61 @@ def club_detail(request, club_id):
     }
     return render(request, 'clubs/club_detail.html', context)
 
+@replica_reads
 def event_list(request):
-    events = Event.objects.filter(
-        date__gte=timezone.now()
-    ).order_by('date')
+    events = keyset_page(
+        events_for(request.user).filter(date__gte=timezone.now()), ('date', 'id'), LIST_PAGE_SIZE,
+        after=request.GET.get('after'), before=request.GET.get('before'),
+    )
     return render(request, 'clubs/event_list.html', {
         'events': events,
         'now': timezone.now()
     })
 
+@public_page_cache('event:{event_id}')
 def event_detail(request, event_id):
-    event = get_object_or_404(Event, id=event_id)
+    event = get_cached_or_404(Event, event_id, related=('club',))
+    waitlist_entry = None
+    if request.user.is_authenticated:
+        waitlist_entry = EventWaitlist.objects.filter(user=request.user, event=event).first()
     return render(request, 'clubs/event_detail.html', {
         'event': event,
-        'now': timezone.now()
+        'now': timezone.now(),
+        'waitlist_position': waitlist_entry.position() if waitlist_entry else None,
     })
 
+def export_response(lines, name, fmt):
+    response = StreamingHttpResponse(lines, content_type=exports.FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{name}"'
+    return response
+
+@login_required
+def export_event_registrations(request, event_id, fmt):
+    event = get_cached_or_404(Event, event_id, related=('club',))
+    if fmt not in exports.FORMATS:
+        raise Http404
+    if not request.user.userprofile.can_manage_club(event.club):
+        messages.error(request, "You don't have permission to export registrations.")
+        return redirect('event_detail', event_id=event_id)
+    return export_response(
+        exports.event_registrations(event, fmt), exports.filename('event-registrations', event.id, fmt), fmt
+    )
+
+@login_required
+def export_club_members(request, club_id, fmt):
+    club = get_cached_or_404(Club, club_id)
+    if fmt not in exports.FORMATS:
+        raise Http404
+    if not request.user.userprofile.can_manage_club(club):
+        messages.error(request, "You don't have permission to export members.")
+        return redirect('club_detail', club_id=club_id)
+    status = request.GET.get('status') or None
+    return export_response(
+        exports.club_members(club, fmt, status), exports.filename('club-members', club.id, fmt), fmt
+    )
+
 def member_list(request, club_id):
-    club = get_object_or_404(Club, id=club_id)
+    club = get_cached_or_404(Club, club_id)
     members = club.members.all()
     return render(request, 'clubs/member_list.html', {'club': club, 'members': members})
 
@@ -111,8 +181,10 @@ def register(request):
         if form.is_valid() and profile_form.is_valid():
             try:
                 with transaction.atomic():
-                    # Create the user first
-                    user = form.save()
+                    # Create the user first; the profile is saved from the
+                    # form below, so skip the signal's empty placeholder
+                    with suppress_profile_sync():
+                        user = form.save()
                     
                     # Create new profile with role
                     profile = profile_form.save(commit=False)
@@ -120,15 +192,10 @@ def register(request):
                     profile.role = 'student'
                     profile.student_id = f'STU{User.objects.count():04d}'
                     profile.save()
+                    images.process_upload(profile_form, 'avatar')
                     
-                    # Important: Save the session before logging in
-                    if not request.session.session_key:
-                        request.session.save()
-                        
-                    # Log the user in
-                    login(request, user)
-                    request.session['role'] = 'student'  # Store role in session
-                    request.session.modified = True  # Mark session as modified
+                    # Log the user in (the role is stored in the session on login)
+                    login(request, user, backend='clubs.auth.RoleBasedAuthenticationBackend')
                     
                     messages.success(request, f'Welcome to College Hub, {user.first_name}! Your student account has been created successfully.')
                     return redirect('dashboard')
@@ -159,6 +226,7 @@ def profile_view(request):
         profile_form = UserProfileForm(request.POST, request.FILES, instance=profile)
         if profile_form.is_valid():
             profile_form.save()
+            images.process_upload(profile_form, 'avatar')
             messages.success(request, 'Profile updated successfully!')
             return redirect('profile')
     else:
@@ -186,30 +254,16 @@ def profile_view(request):
 
 @login_required
 def dashboard(request):
-    # Get upcoming events the user has registered for
-    registered_events = Event.objects.filter(
-        registered_users=request.user,
-        date__gte=timezone.now()
-    ).order_by('date')
-    
-    # Get clubs the user is a member of
-    user_clubs = Club.objects.filter(members=request.user)
-    
-    # Get recommended clubs and events
-    recommended_clubs = Club.get_recommended_clubs(request.user)
-    recommended_events = Event.get_recommended_events(request.user)
-    
-    context = {
-        'registered_events': registered_events,
-        'user_clubs': user_clubs,
-        'recommended_clubs': recommended_clubs,
-        'recommended_events': recommended_events,
-    }
+    # Panels are lazy; a warm fragment cache never runs their queries
+    context = dashboard_panels.panels(request.user)
+    context['membership_version'] = dashboard_panels.membership_version(request.user.id)
+    context['fragment_timeout'] = dashboard_panels.FRAGMENT_TIMEOUT
     return render(request, 'dashboard.html', context)
 
 @login_required
+@retry_on_locked
 def join_club(request, club_id):
-    club = get_object_or_404(Club, id=club_id)
+    club = get_cached_or_404(Club, club_id)
     
     # Check if user is already a member
     existing_membership = ClubMembership.objects.filter(
@@ -241,7 +295,7 @@ def join_club(request, club_id):
 
 @login_required
 def leave_club(request, club_id):
-    club = get_object_or_404(Club, id=club_id)
+    club = get_cached_or_404(Club, club_id)
     
     if request.method == 'POST':
         membership = ClubMembership.objects.filter(user=request.user, club=club)
@@ -254,25 +308,27 @@ def leave_club(request, club_id):
     return redirect('club_detail', club_id=club.id)
 
 @login_required
+@retry_on_locked
 def register_event(request, event_id):
-    event = get_object_or_404(Event, id=event_id)
+    event = get_cached_or_404(Event, event_id)
     next_page = request.GET.get('next', 'event_detail')
     
     if request.method == 'POST':
-        if event.date < timezone.now():
+        result = event.register(request.user)
+        if result == 'registered':
+            messages.success(request, f'You have successfully registered for {event.title}!')
+        elif result == 'duplicate':
+            messages.warning(request, 'You are already registered for this event.')
+        elif result == 'passed':
             messages.error(request, 'This event has already passed.')
-        elif event.registration_deadline and event.registration_deadline < timezone.now():
+        elif result == 'closed':
             messages.error(request, 'Registration deadline has passed.')
-        elif event.is_full:
-            messages.error(request, 'This event is full.')
-        elif not EventRegistration.objects.filter(user=request.user, event=event).exists():
-            EventRegistration.objects.create(
-                user=request.user,
-                event=event
-            )
-            messages.success(request, f'You have successfully registered for {event.title}!')
         else:
-            messages.warning(request, 'You are already registered for this event.')
+            position = event.join_waitlist(request.user)
+            if position is None:
+                messages.warning(request, 'You are already registered for this event.')
+            else:
+                messages.info(request, f'This event is full. You are number {position} on the waitlist.')
     
     # Return to the appropriate page
     if next_page == 'calendar':
@@ -284,82 +340,39 @@ def register_event(request, event_id):
 
 @login_required
 def cancel_event_registration(request, event_id):
-    event = get_object_or_404(Event, id=event_id)
+    event = get_cached_or_404(Event, event_id)
     
     if request.method == 'POST':
-        registration = EventRegistration.objects.filter(user=request.user, event=event)
-        if registration.exists():
-            registration.delete()
+        if event.cancel_registration(request.user):
             messages.success(request, f'Your registration for {event.title} has been cancelled.')
+        elif EventWaitlist.objects.filter(user=request.user, event=event).delete()[0]:
+            messages.success(request, f'You have left the waitlist for {event.title}.')
         else:
             messages.warning(request, 'You are not registered for this event.')
     
     return redirect('event_detail', event_id=event.id)
 
+@replica_reads
 @login_required
 def calendar_view(request):
-    from datetime import datetime, timedelta
-    from django.utils.timezone import make_aware
-    import calendar
-    
-    # Get requested month or use current date
-    month_param = request.GET.get('month')
-    if month_param:
-        try:
-            current_date = datetime.strptime(month_param, '%Y-%m')
-            current_date = make_aware(datetime(current_date.year, current_date.month, 1))
-        except ValueError:
-            current_date = timezone.now()
-    else:
-        current_date = timezone.now()
-    
-    # Calculate current, previous, and next month dates
-    current_month_start = make_aware(datetime(current_date.year, current_date.month, 1))
-    if current_date.month == 1:
-        prev_month_start = make_aware(datetime(current_date.year - 1, 12, 1))
-    else:
-        prev_month_start = make_aware(datetime(current_date.year, current_date.month - 1, 1))
-        
-    if current_date.month == 12:
-        next_month_start = make_aware(datetime(current_date.year + 1, 1, 1))
-    else:
-        next_month_start = make_aware(datetime(current_date.year, current_date.month + 1, 1))
-
-    # Get events for current month
-    current_month_events = Event.objects.filter(
-        date__year=current_month_start.year,
-        date__month=current_month_start.month
-    ).order_by('date')
-
-    # Get events for next month
-    next_month_events = Event.objects.filter(
-        date__year=next_month_start.year,
-        date__month=next_month_start.month
-    ).order_by('date')
-    
-    # Create calendar data
-    cal = calendar.monthcalendar(current_date.year, current_date.month)
-    
-    # Get events organized by day
-    events_by_day = {}
-    for event in current_month_events:
-        day = event.date.day
-        if day not in events_by_day:
-            events_by_day[day] = []
-        events_by_day[day].append(event)
-
-    context = {
-        'current_month_events': current_month_events,
-        'next_month_events': next_month_events,
-        'prev_month': prev_month_start,
-        'current_month': current_month_start,
-        'next_month': next_month_start,
-        'calendar_weeks': cal,
-        'events_by_day': events_by_day,
-        'weekdays': ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
-    }
+    current_date = calendar_data.requested_month(request.GET.get('month'))
+    _, current, following = calendar_data.month_starts(current_date)
+
+    # Cached, per-month payloads (events grouped by day), seat state filled live
+    current_month = calendar_data.get_month(current.year, current.month)
+    next_month = calendar_data.get_month(following.year, following.month)
+    calendar_data.mark_full(current_month, next_month)
+    context = calendar_data.page_context(current_date, current_month, next_month)
     return render(request, 'clubs/calendar.html', context)
 
+@replica_reads
+@login_required
+def calendar_month_json(request, year, month):
+    if not 1 <= month <= 12:
+        return JsonResponse({'error': 'Invalid month'}, status=400)
+    return JsonResponse(calendar_data.month_json(year, month))
+
+@replica_reads
 def public_profile_view(request, username):
     user = get_object_or_404(User, username=username)
     context = {
@@ -371,7 +384,7 @@ def public_profile_view(request, username):
 
 @login_required
 def club_manage(request, club_id):
-    club = get_object_or_404(Club, id=club_id)
+    club = get_cached_or_404(Club, club_id)
     user_profile = request.user.userprofile
     membership = ClubMembership.objects.filter(user=request.user, club=club).first()
 
@@ -419,7 +432,7 @@ def club_manage(request, club_id):
 
 @login_required
 def approve_member(request, club_id, membership_id):
-    club = get_object_or_404(Club, id=club_id)
+    club = get_cached_or_404(Club, club_id)
     membership = get_object_or_404(ClubMembership, id=membership_id, club=club)
     
     if not request.user.userprofile.can_manage_club(club):
@@ -430,13 +443,45 @@ def approve_member(request, club_id, membership_id):
     membership.approved_by = request.user
     membership.approved_date = timezone.now()
     membership.save()
+    notifications.record('membership_approved', club, actor=request.user, subject=membership.user)
+    transaction.on_commit(lambda: recommendations.refresh_club(club.id))
     
     messages.success(request, f'{membership.user.get_full_name()} has been approved as a member.')
     return redirect('club_manage', club_id=club_id)
 
+@login_required
+def bulk_moderate_members(request, club_id):
+    club = get_cached_or_404(Club, club_id)
+    wants_json = 'application/json' in request.headers.get('Accept', '')
+
+    if not request.user.userprofile.can_manage_club(club):
+        if wants_json:
+            return JsonResponse({'error': 'forbidden'}, status=403)
+        messages.error(request, "You don't have permission to moderate members.")
+        return redirect('club_detail', club_id=club_id)
+
+    if request.method != 'POST':
+        return redirect('club_manage', club_id=club_id)
+
+    action = request.POST.get('action')
+    all_pending = request.POST.get('select_all_pending') == '1'
+    membership_ids = [pk for pk in request.POST.getlist('membership_ids') if pk.isdigit()]
+    if action not in moderation.ACTIONS or not (all_pending or membership_ids):
+        if wants_json:
+            return JsonResponse({'error': 'invalid request'}, status=400)
+        messages.error(request, 'Select some members and an action first.')
+        return redirect('club_manage', club_id=club_id)
+
+    changed = moderation.moderate(club, action, request.user, membership_ids, all_pending)
+    if wants_json:
+        return JsonResponse({'action': action, 'updated': changed})
+    past = {'approve': 'approved', 'reject': 'rejected', 'remove': 'removed'}[action]
+    messages.success(request, f'{changed} membership{"s" if changed != 1 else ""} {past}.')
+    return redirect('club_manage', club_id=club_id)
+
 @login_required
 def reject_member(request, club_id, membership_id):
-    club = get_object_or_404(Club, id=club_id)
+    club = get_cached_or_404(Club, club_id)
     membership = get_object_or_404(ClubMembership, id=membership_id, club=club)
     
     if not request.user.userprofile.can_manage_club(club):
@@ -451,7 +496,7 @@ def reject_member(request, club_id, membership_id):
 
 @login_required
 def make_leader(request, club_id, membership_id):
-    club = get_object_or_404(Club, id=club_id)
+    club = get_cached_or_404(Club, club_id)
     membership = get_object_or_404(ClubMembership, id=membership_id, club=club)
     
     if not request.user.userprofile.is_faculty_advisor(club):
@@ -460,13 +505,33 @@ def make_leader(request, club_id, membership_id):
     
     membership.role = 'leader'
     membership.save()
+    notifications.record('leader_assigned', club, actor=request.user, subject=membership.user)
     
     messages.success(request, f'{membership.user.get_full_name()} has been made a club leader.')
     return redirect('club_manage', club_id=club_id)
 
+@login_required
+def assign_leader(request, club_id):
+    club = get_cached_or_404(Club, club_id)
+    
+    if not request.user.userprofile.is_faculty_advisor(club):
+        messages.error(request, "Only faculty advisors can assign club leaders.")
+        return redirect('club_detail', club_id=club_id)
+    
+    form = LeaderAssignmentForm(club, request.POST or None)
+    if request.method == 'POST' and form.is_valid():
+        membership = get_object_or_404(ClubMembership, club=club, user=form.cleaned_data['user'])
+        membership.role = 'leader'
+        membership.save()
+        notifications.record('leader_assigned', club, actor=request.user, subject=membership.user)
+        messages.success(request, f'{membership.user.get_full_name()} has been made a club leader.')
+    else:
+        messages.error(request, 'Please select a member to assign as leader.')
+    return redirect('club_manage', club_id=club_id)
+
 @login_required
 def create_event(request, club_id):
-    club = get_object_or_404(Club, id=club_id)
+    club = get_cached_or_404(Club, club_id)
     
     if not request.user.userprofile.can_manage_events(club):
         messages.error(request, "You don't have permission to create events.")
@@ -479,6 +544,7 @@ def create_event(request, club_id):
             event.club = club
             event.created_by = request.user
             event.save()
+            images.process_upload(form, 'image', 'thumbnail')
             messages.success(request, 'Event created successfully! Awaiting faculty approval.')
             return redirect('club_manage', club_id=club_id)
     
@@ -487,7 +553,7 @@ def create_event(request, club_id):
 
 @login_required
 def approve_event(request, event_id):
-    event = get_object_or_404(Event, id=event_id)
+    event = get_cached_or_404(Event, event_id, related=('club',))
     
     if not request.user.userprofile.is_faculty_advisor(event.club):
         messages.error(request, "Only faculty advisors can approve events.")
@@ -496,14 +562,15 @@ def approve_event(request, event_id):
     event.status = 'approved'
     event.approved_by = request.user
     event.approved_date = timezone.now()
-    event.save()
+    event.save(update_fields=['status', 'approved_by', 'approved_date'])
+    notifications.record('event_approved', event.club, actor=request.user, event=event)
     
     messages.success(request, f'Event "{event.title}" has been approved.')
     return redirect('club_manage', club_id=event.club.id)
 
 @login_required
 def reject_event(request, event_id):
-    event = get_object_or_404(Event, id=event_id)
+    event = get_cached_or_404(Event, event_id, related=('club',))
     
     if not request.user.userprofile.is_faculty_advisor(event.club):
         messages.error(request, "Only faculty advisors can reject events.")
@@ -512,14 +579,14 @@ def reject_event(request, event_id):
     event.status = 'rejected'
     event.approved_by = None
     event.approved_date = None
-    event.save()
+    event.save(update_fields=['status', 'approved_by', 'approved_date'])
     
     messages.success(request, f'Event "{event.title}" has been rejected.')
     return redirect('club_manage', club_id=event.club.id)
 
 @login_required
 def remove_member(request, club_id, membership_id):
-    club = get_object_or_404(Club, id=club_id)
+    club = get_cached_or_404(Club, club_id)
     membership = get_object_or_404(ClubMembership, id=membership_id, club=club)
     
     if not request.user.userprofile.can_manage_club(club):
@@ -542,6 +609,7 @@ def remove_member(request, club_id, membership_id):
 
 @login_required
 def update_club(request, club_id):
+    # Saved in full below, so read the row itself rather than a cached copy
     club = get_object_or_404(Club, id=club_id)
     
     if not request.user.userprofile.can_manage_club(club):
@@ -552,6 +620,7 @@ def update_club(request, club_id):
         form = ClubUpdateForm(request.POST, request.FILES, instance=club)
         if form.is_valid():
             form.save()
+            images.process_upload(form, 'image', 'thumbnail')
             messages.success(request, 'Club details have been updated successfully.')
         else:
             messages.error(request, 'There was an error updating the club details.')
@@ -560,7 +629,7 @@ def update_club(request, club_id):
 
 @login_required
 def delete_club(request, club_id):
-    club = get_object_or_404(Club, id=club_id)
+    club = get_cached_or_404(Club, club_id)
     
     if not request.user.userprofile.can_delete_club(club):
         messages.error(request, "You don't have permission to delete this club.")
@@ -577,3 +646,23 @@ def delete_club(request, club_id):
             messages.error(request, 'Please type "DELETE" to confirm club deletion.')
     
     return redirect('club_manage', club_id=club_id)
+
+@login_required
+def notification_feed(request):
+    last_read_id = notifications.last_read_id(request.user)
+    activities = notifications.feed_page(
+        request.user, after=request.GET.get('after'), before=request.GET.get('before')
+    )
+    # Opening the newest page reads everything up to its top entry
+    if not activities.has_previous and len(activities):
+        notifications.mark_read(request.user, up_to=activities.object_list[0].id)
+    return render(request, 'clubs/notifications.html', {
+        'activities': activities,
+        'last_read_id': last_read_id,
+    })
+
+@login_required
+def notification_unread_count(request):
+    # Fetched by the navbar badge, so page renders don't pay for the count
+    count = notifications.unread_count(request.user)
+    return JsonResponse({'unread': min(count, notifications.UNREAD_CAP), 'more': count > notifications.UNREAD_CAP})
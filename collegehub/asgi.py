@@ -0,0 +1,7 @@
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'collegehub.settings')
+# Serve the read-only pages from clubs.async_views (see settings.ROOT_URLCONF)
+os.environ.setdefault('COLLEGEHUB_ASYNC_VIEWS', '1')
+application = get_asgi_application()
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from django.urls import path, include
+from django.conf import settings
+from django.conf.urls.static import static
+from clubs.urls import async_urlpatterns
+
+# collegehub.urls with the read-only pages on their async views (see asgi.py)
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('', include(async_urlpatterns)),
+] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -22,15 +22,21 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'clubs.middleware.QueryInstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'clubs.middleware.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'collegehub.urls'
+# Set by collegehub/asgi.py: the read-only pages are served by their async
+# versions in clubs.async_views
+if os.environ.get('COLLEGEHUB_ASYNC_VIEWS') == '1':
+    ROOT_URLCONF = 'collegehub.asgi_urls'
 
 TEMPLATES = [
     {
@@ -52,14 +58,92 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'collegehub.wsgi.application'
+ASGI_APPLICATION = 'collegehub.asgi.application'
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Keep connections open across requests; pragmas are applied once
+        # per connection in clubs.db
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds a writer waits for the lock; the only place it is set
+            # (clubs.db has the worst case with retries on top)
+            'timeout': 5,
+        },
+        # File-backed, so tests can hit it from several threads at once
+        'TEST': {
+            'NAME': os.path.join(BASE_DIR, 'var', 'test_db.sqlite3'),
+        },
+    }
+}
+
+# Read replicas for @replica_reads views (clubs.routing). Locally these are
+# SQLite copies of db.sqlite3 in var/ (untracked) kept fresh by
+# `manage.py snapshot_replicas`; DATABASE_REPLICAS=2 in the environment
+# enables two of them.
+DATABASE_REPLICAS = []
+for _n in range(1, int(os.environ.get('DATABASE_REPLICAS', '0')) + 1):
+    DATABASES[f'replica{_n}'] = {
+        **DATABASES['default'],
+        'NAME': os.path.join(BASE_DIR, 'var', f'db-replica{_n}.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append(f'replica{_n}')
+DATABASE_ROUTERS = ['clubs.routing.ReplicaRouter']
+# Seconds of writes a replica may be behind and still serve reads, and how
+# long a client reads from the primary after it writes something
+DATABASE_REPLICA_MAX_LAG = 30
+DATABASE_REPLICA_PIN_SECONDS = 15
+
+# Generation counters and cached pages/fragments live here. Local memory is
+# per process; with several workers point 'default' at a shared backend
+# (e.g. django.core.cache.backends.filebased.FileBasedCache) so invalidation
+# reaches all of them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'collegehub',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    # Kept apart so sessions aren't evicted by cached pages and fragments
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'collegehub-sessions',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
 }
 
+# With more than one worker process the session cache has to be shared, or a
+# worker can keep serving a session another one logged out: set
+# SESSION_REDIS_URL (e.g. redis://localhost:6379/1, needs the redis package).
+# Local memory is only correct for a single process.
+if os.environ.get('SESSION_REDIS_URL'):
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['SESSION_REDIS_URL'],
+    }
+
+# Sessions live in the 'sessions' cache (clubs.sessions). Login and logout
+# reach the database straight away; other changes are written behind every
+# SESSION_WRITE_BEHIND_INTERVAL seconds. Expired rows are removed with
+# `manage.py purge_sessions`.
+SESSION_ENGINE = 'clubs.sessions'
+SESSION_CACHE_ALIAS = 'sessions'
+SESSION_WRITE_BEHIND_INTERVAL = 2.0
+
+# Per-request SQL stats, N+1 warnings and Server-Timing headers (logger
+# 'clubs.sql'). Off unless SQL_INSTRUMENTATION=1 is set in the environment.
+SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION') == '1'
+SQL_INSTRUMENTATION_N_PLUS_ONE = 5
+
+# Anonymous page cache (clubs.page_cache): seconds a page is served as fresh,
+# then how much longer it may be served stale while one request re-renders it
+PAGE_CACHE_TIMEOUT = 60
+PAGE_CACHE_STALE_TIMEOUT = 600
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -57,6 +57,20 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }, 5000);
 
+    // Unread notifications, fetched separately so pages render without counting them
+    const unreadBadge = document.getElementById('unreadBadge');
+    if(unreadBadge) {
+        fetch(unreadBadge.dataset.unreadUrl, {credentials: 'same-origin'})
+            .then(response => response.ok ? response.json() : null)
+            .then(data => {
+                if(data && data.unread) {
+                    unreadBadge.textContent = data.unread + (data.more ? '+' : '');
+                    unreadBadge.classList.remove('d-none');
+                }
+            })
+            .catch(() => {});
+    }
+
     // Add hover effects to cards
     document.querySelectorAll('.card').forEach(card => {
         card.addEventListener('mouseenter', function() {